@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Orchestration overhead of runner: executables doing nothing
+    or writing large output are run over grid of worker counts,
+    space sizes and execution modes. Reports launches per second,
+    mean latency of launch phases in milliseconds
+    and peak RSS of parent process.
+
+    Results are appended to a JSON file labeled by version,
+    `--compare` prints ratios to results stored by another version.
+
+    python -m benchmarks.overhead --processes 1 4 --points 100 1000
+        --output overhead.json --label "$(git describe --always)"
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+import psutil
+
+from process_performance.context import InvokeContextInterface
+from process_performance.mode import ExecutionMode
+from process_performance.parameters import Parameters
+from process_performance.progress import PHASES, Progress
+from process_performance.runner import run
+
+EXECUTABLES = {
+    'true': ['true'],
+    'sleep0': ['sleep', '0'],
+    # 4 MiB on stdout, read by capture threads
+    'output': ['head', '-c', str(4 << 20), '/dev/zero'],
+}
+
+
+class OverheadContext(InvokeContextInterface):
+    '''
+        Runs executable named by `executable` parameter,
+        keeps its output size so captured output is not optimized away.
+    '''
+    point: int = 0
+    exit_code: int = None
+    output: int = 0
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.exit_code = result.exit_code
+        self.output = len(result.stdout)
+
+    def error(self, exception) -> None:
+        print(exception)
+
+    def argv(self, args) -> list:
+        self.point = args['point']
+        return EXECUTABLES[args['executable']]
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'point': self.point,
+            'exit': self.exit_code,
+            'output': self.output,
+        }
+
+
+class _PeakRss():
+    """
+    Samples resident set size of this process in background thread.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, self._process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+
+
+def measure(
+        executable: str,
+        processes: int,
+        points: int,
+        mode: ExecutionMode) -> dict:
+    """
+    Runs one case, returns its metrics.
+    """
+    param_space = Parameters.from_dict({
+        'executable': [executable],
+        'point': list(range(points)),
+    })
+    progress = Progress(interval=3600)
+    with _PeakRss() as rss:
+        started = time.perf_counter()
+        data = run(
+            processes=processes,
+            context_class=OverheadContext,
+            parameters_space=param_space,
+            mode=mode,
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+    assert len(data) == points
+    assert all(d['exit'] == 0 for d in data)
+    overhead = progress.metrics()['overhead']
+    return {
+        'executable': executable,
+        'processes': processes,
+        'points': points,
+        'mode': mode.name,
+        'launches_per_second': points / elapsed,
+        'latency': {phase: overhead[phase] for phase in PHASES},
+        'parent_peak_rss': rss.peak,
+    }
+
+
+def _key(result: dict) -> tuple:
+    return (result['executable'], result['processes'],
+            result['points'], result['mode'])
+
+
+def _load(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _store(path: str, label: str, results: list[dict]) -> None:
+    """
+    Appends run to stored runs, replacing previous run of same label.
+    """
+    runs = [stored for stored in _load(path) if stored['label'] != label]
+    runs.append({
+        'label': label,
+        'time': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    })
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(runs, file, indent=1)
+
+
+def _baseline(path: str, label: str) -> dict:
+    """
+    Results of run with label, last stored run if label is None.
+    """
+    runs = _load(path)
+    if label is not None:
+        runs = [stored for stored in runs if stored['label'] == label]
+    if not runs:
+        raise SystemExit(f'no stored run {label or ""} in {path}')
+    return {_key(result): result for result in runs[-1]['results']}
+
+
+def _format(result: dict, baseline: dict) -> str:
+    latency = ' '.join(
+        f'{result["latency"][phase] * 1e3:>8.2f}' for phase in PHASES)
+    line = (
+        f'{result["executable"]:>8} {result["processes"]:>9} '
+        f'{result["points"]:>6} {result["mode"]:>8} '
+        f'{result["launches_per_second"]:>8.1f}/s {latency} '
+        f'{result["parent_peak_rss"] / (1 << 20):>7.1f}M')
+    previous = baseline.get(_key(result))
+    if previous is not None:
+        ratio = (result['launches_per_second']
+                 / previous['launches_per_second'])
+        line += f' {ratio:>6.2f}x'
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--executables', nargs='+', default=list(EXECUTABLES),
+                        choices=list(EXECUTABLES))
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--points', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--modes', nargs='+',
+                        default=[mode.name for mode in ExecutionMode],
+                        choices=[mode.name for mode in ExecutionMode])
+    parser.add_argument('--output', help='JSON file results are stored to')
+    parser.add_argument('--label', default='current',
+                        help='version results are stored as')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='JSON file with results to compare to')
+    parser.add_argument('--baseline', metavar='LABEL',
+                        help='stored run to compare to, last one by default')
+    args = parser.parse_args()
+    if sys.platform == 'win32':
+        raise SystemExit('benchmark executables are not available on win32')
+
+    baseline = {}
+    if args.compare is not None:
+        baseline = _baseline(args.compare, args.baseline)
+    print(f'{"exec":>8} {"processes":>9} {"points":>6} {"mode":>8} '
+          f'{"launches":>10} ' +
+          ' '.join(f'{phase:>8}' for phase in PHASES) +
+          f' {"rss":>8}' + (f' {"ratio":>7}' if baseline else ''))
+    results = []
+    for executable in args.executables:
+        for processes in args.processes:
+            for points in args.points:
+                for mode in args.modes:
+                    result = measure(
+                        executable, processes, points, ExecutionMode[mode])
+                    results.append(result)
+                    print(_format(result, baseline), flush=True)
+    if args.output is not None:
+        _store(args.output, args.label, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Sweep throughput depending on worker count and execution mode.
+    Runs trivial executable many times and reports launches per second.
+
+    python -m benchmarks.scaling --points 200 --processes 1 2 4 8
+"""
+
+import argparse
+import sys
+import time
+
+from process_performance.context import InvokeContextInterface
+from process_performance.mode import ExecutionMode
+from process_performance.monitor import Monitor, MonitorStrategy
+from process_performance.parameters import Parameters
+from process_performance.runner import run
+from process_performance.shape import ParameterSpaceShape
+
+
+class TrivialContext(InvokeContextInterface):
+    '''
+        Runs executable doing nothing,
+        counts status calls as a typical context would.
+    '''
+    point: int = 0
+    exit_code: int = None
+    status_calls: int = 0
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.exit_code = result.exit_code
+
+    def error(self, exception) -> None:
+        print(exception)
+
+    def argv(self, args) -> list:
+        self.point = args['point']
+        if sys.platform == 'win32':
+            return ['cmd.exe', '/c', 'exit']
+        return ['true']
+
+    def status(self, pid: int) -> None:
+        self.status_calls += 1
+
+    def data(self) -> dict:
+        return {
+            'point': self.point,
+            'exit': self.exit_code,
+            'status_calls': self.status_calls,
+        }
+
+
+def measure(processes: int, points: int, mode: ExecutionMode,
+            monitor: Monitor) -> float:
+    """
+    Returns launches per second.
+    """
+    param_space = Parameters.from_dict({'point': list(range(points))})
+    started = time.perf_counter()
+    data = run(
+        processes=processes,
+        context_class=TrivialContext,
+        parameters_space=param_space,
+        shape=ParameterSpaceShape.CUBE,
+        mode=mode,
+        monitor=monitor,
+    )
+    elapsed = time.perf_counter() - started
+    assert len(data) == points
+    return points / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=200)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    parser.add_argument('--monitor', default='ADAPTIVE',
+                        choices=[s.name for s in MonitorStrategy])
+    args = parser.parse_args()
+
+    monitor = Monitor(strategy=MonitorStrategy[args.monitor])
+    print(f'{"processes":>9} ' +
+          ' '.join(f'{mode.name:>10}' for mode in ExecutionMode))
+    for processes in args.processes:
+        rates = [measure(processes, args.points, mode, monitor)
+                 for mode in ExecutionMode]
+        print(f'{processes:>9} ' +
+              ' '.join(f'{rate:>8.1f}/s' for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
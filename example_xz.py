@@ -5,12 +5,30 @@
 """
 
 import os
-import csv
 import matplotlib.pyplot as plt
 
+from process_performance.fixture import Fixture
 from process_performance.parameters import Parameters
 from process_performance.runner import InvokeContextInterface, run
 from process_performance.shape import ParameterSpaceShape
+from process_performance.sinks import CsvSink
+
+
+EXAMPLE_FILE = 'example.file'
+
+
+def build_example_file(fixturedir) -> None:
+    '''
+        Called once per run, builds file to be compressed
+        which is then placed into every working directory
+    '''
+    with open(os.path.join(fixturedir, EXAMPLE_FILE), 'wb') as example_file:
+        with open(__file__, 'rb') as _self_file:
+            _self_file_data = _self_file.read()
+            for _ in range(10):
+                for chunk_length in range(len(_self_file_data)):
+                    example_file.write(
+                        _self_file_data[-chunk_length:chunk_length])
 
 
 # pylint: disable=too-many-instance-attributes
@@ -31,19 +49,10 @@ class InvokeContext(InvokeContextInterface):
     def pre(self, workdir) -> None:
         '''
             Called right before process spawns,
-            receives directory process will start in
+            receives directory process will start in,
+            example file is already placed there
         '''
-        filename = 'example.file'
-        filepath = os.path.join(workdir, filename)
-        with open(filepath, 'wb') as example_file:
-            with open(__file__, 'rb') as _self_file:
-                _self_file_data = _self_file.read()
-                for _ in range(10):
-                    for chunk_length in range(len(_self_file_data)):
-                        example_file.write(
-                            _self_file_data[-chunk_length:chunk_length])
-
-        self.file_path = os.path.abspath(filepath)
+        self.file_path = os.path.abspath(os.path.join(workdir, EXAMPLE_FILE))
         self.file_size_raw = os.stat(self.file_path).st_size
 
     def post(self) -> None:
@@ -103,25 +112,24 @@ def main():
         'extreme': ['', '-e'],
     })
 
-    # run process with all possible parameters
-    data = run(
-        processes=1,
-        context_class=InvokeContext,
-        parameters_space=param_space,
-        shape=ParameterSpaceShape.CUBE
-    )
-
-    # write data to csv for later analysis
+    # data is written to csv for later analysis as soon as it is returned
     headers = [
         'exit',
         'size_raw', 'size_compressed',
         'usertime', 'systemtime',
         'ratio', 'extreme',
         'args']
-    with open('example_xz.csv', 'w', newline='', encoding='utf-8') as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=headers)
-        writer.writeheader()
-        writer.writerows(data)
+
+    # run process with all possible parameters
+    data = run(
+        processes=1,
+        context_class=InvokeContext,
+        parameters_space=param_space,
+        shape=ParameterSpaceShape.CUBE,
+        # reflinked by default, falls back to copy where not supported
+        fixture=Fixture(build=build_example_file),
+        sinks=[CsvSink('example_xz.csv', fields=headers)],
+    )
 
     plt.grid(visible=True)
     for extreme in [False, True]:
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Runner supervising all processes from a single asyncio event loop,
+    without pool workers, manager and reader threads.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import logging
+import os
+import time
+
+from process_performance.capture import Capture
+from process_performance.context import InvokeContextInterface
+from process_performance.dedup import DuplicateArgvException, claim
+from process_performance.fixture import Fixture, PreparedFixture
+from process_performance.launch import _Launch
+from process_performance.limits import Limits, share_best
+from process_performance.mode import ExecutionMode
+from process_performance.monitor import (
+    Monitor, MonitorStrategy, _Watch)
+from process_performance.parameters import Parameters
+from process_performance.sampler import Sampler
+from process_performance.runner import (
+    _LocalTask, _Point, _Scheduler, _check_spawn_options)
+from process_performance.search import SearchStrategy, ShapeSearch
+from process_performance.shape import ParameterSpaceShape
+from process_performance.tree import ProcessTree
+from process_performance.usage import exited
+from process_performance.workdir import Workdir, WorkdirMode
+
+
+async def _call(method, *args, **kwargs):
+    """
+    Calls context method, awaits result of async variant.
+    """
+    result = method(*args, **kwargs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def _call_status(status, pid: int):
+    try:
+        await _call(status, pid)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        logging.getLogger(__name__).warning(
+            'InvokeContextInterface.status exception: %s', exc)
+
+
+class _ExitWaiter():
+    """
+    Waits in event loop until process exits without reaping it,
+    so exit status and resource usage are still available afterwards.
+
+    Uses pidfd on linux, falls back to polling process state.
+    """
+
+    def __init__(self, process, poll_interval: float):
+        self._process = process
+        self._poll_interval = poll_interval
+        self._loop = asyncio.get_running_loop()
+        self._exited = self._loop.create_future()
+        self._pidfd = None
+        try:
+            self._pidfd = os.pidfd_open(process.pid)
+            self._loop.add_reader(self._pidfd, self._on_exit)
+        except (AttributeError, OSError, NotImplementedError):
+            self.close()
+
+    def _on_exit(self):
+        if not self._exited.done():
+            self._exited.set_result(True)
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds,
+        returns True if process exited.
+        """
+        if self._pidfd is None:
+            deadline = time.perf_counter() + timeout
+            while not exited(self._process):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                await asyncio.sleep(min(self._poll_interval, remaining))
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._exited), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def close(self):
+        if self._pidfd is not None:
+            self._loop.remove_reader(self._pidfd)
+            os.close(self._pidfd)
+            self._pidfd = None
+
+
+@contextlib.asynccontextmanager
+async def _in_thread(manager):
+    """
+    Enters and exits blocking context manager in a thread,
+    so file system work does not stall other processes.
+    """
+    value = await asyncio.to_thread(manager.__enter__)
+    try:
+        yield value
+    except BaseException as exc:  # pylint: disable=broad-exception-caught
+        if not await asyncio.to_thread(
+                manager.__exit__, type(exc), exc, exc.__traceback__):
+            raise
+    else:
+        await asyncio.to_thread(manager.__exit__, None, None, None)
+
+
+async def _watch(
+        process,
+        status,
+        monitor: Monitor,
+        limits: Limits,
+        started: float) -> str:
+    """
+    Async counterpart of Monitor.watch, POLL strategy checks
+    process state every interval instead of waiting for exit event.
+    """
+    watch = _Watch(monitor, process, limits, started)
+    waiter = _ExitWaiter(process, monitor.interval)
+    if monitor.strategy == MonitorStrategy.POLL:
+        waiter.close()
+    try:
+        await _call_status(status, process.pid)
+        while not await waiter.wait(watch.check()):
+            watch.waited()
+            await _call_status(status, process.pid)
+    finally:
+        waiter.close()
+    return watch.killed
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+# pylint: disable=too-many-locals
+async def _spawn_process(
+        context: InvokeContextInterface,
+        params: dict,
+        monitor: Monitor = Monitor(),
+        stdout: Capture = Capture(),
+        stderr: Capture = Capture(),
+        fixture: PreparedFixture = None,
+        workdir: Workdir = Workdir(),
+        limits: Limits = None,
+        argv_claims: dict = None,
+        claim_id: int = None,
+        sampler: Sampler = None,
+        tree: ProcessTree = ProcessTree()):
+    launch = _Launch()
+    async with _in_thread(workdir.use()) as tmpdir:
+        if fixture is not None:
+            await asyncio.to_thread(fixture.materialize, tmpdir)
+        await _call(context.pre, workdir=tmpdir)
+        argv = await _call(context.argv, args=params)
+        if argv_claims is not None:
+            claim(argv_claims, argv, tmpdir, claim_id)
+
+        # asyncio.create_subprocess_exec would reap the process
+        # in its child watcher, losing its resource usage
+        process = launch.spawn(
+            argv, tmpdir, stdout, stderr, tree, sampler, read=False)
+        readers = asyncio.gather(
+            launch.stdout.read_async(process.stdout),
+            launch.stderr.read_async(process.stderr))
+        try:
+            killed = await _watch(
+                process, context.status, monitor, limits, launch.started)
+        finally:
+            # kills process still running when watching is cancelled
+            launch.reap()
+            await readers
+        result = launch.result(killed, limits)
+
+        await _call(context.post)
+    result.timings = launch.timings()
+    return result
+
+
+async def _run_context(
+        context_class: type,
+        params: dict,
+        spawn_options: dict) -> tuple[bool, dict, dict]:
+    """
+    Async counterpart of runner._run_local.
+    """
+    context = context_class()
+    try:
+        result = await _spawn_process(context, params, **spawn_options)
+    except DuplicateArgvException:
+        raise
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        await _call(context.error, exc)
+        return True, await _call(context.data), {'error': repr(exc)}
+    await _call(context.success, result)
+    return (
+        result.killed is not None, await _call(context.data), result.timings)
+
+
+class _AsyncScheduler(_Scheduler):
+    """
+    Scheduler running every submitted point as asyncio task,
+    at most `concurrency` of them at once.
+    """
+
+    def __init__(self, concurrency: int, context_class: type, **options):
+        super().__init__(
+            concurrency, context_class, tasks_per_process=1,
+            mode=ExecutionMode.LOCAL, **options)
+        self._tasks = set()
+
+    async def _run_task(self, task: _LocalTask):
+        try:
+            payload = await _run_context(
+                self.context_class, task.point.params,
+                self._spawn_options(task.point))
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            task.error(exc)
+            return
+        task.success(payload)
+
+    def _submit(self, point: _Point):
+        task = _LocalTask(point, self._done)
+        future = asyncio.ensure_future(self._run_task(task))
+        self._tasks.add(future)
+        future.add_done_callback(self._tasks.discard)
+        self._in_flight += 1
+
+    async def run_async(self):
+        self._start()
+        try:
+            while True:
+                for completed in self._propose():
+                    yield completed
+                if not self._in_flight:
+                    break
+                while self._done.empty():
+                    await asyncio.wait(
+                        self._tasks, return_when=asyncio.FIRST_COMPLETED,
+                        timeout=self._interval())
+                    self._tick()
+                for completed in self._completed(self._done.get_nowait()):
+                    yield completed
+        finally:
+            self._stop()
+            for future in self._tasks:
+                future.cancel()
+            if self._tasks:
+                await asyncio.wait(self._tasks)
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+async def _run_indexed(
+        concurrency: int,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape,
+        search: SearchStrategy = None,
+        fixture: Fixture = None,
+        workdir: Workdir = Workdir(),
+        limits: Limits = None,
+        dedup_argv: bool = False,
+        **options):
+    unsupported = sorted(
+        {'tasks_per_process', 'mode', 'placement'}.intersection(options))
+    if unsupported:
+        raise TypeError(
+            f'unexpected options {", ".join(unsupported)}, processes are '
+            'supervised by the event loop, not by pool workers')
+    if workdir.mode != WorkdirMode.TEMPORARY:
+        raise ValueError(
+            'persistent working directories are per process, '
+            'they would be shared by concurrent processes, '
+            'use temporary ones')
+    if search is None:
+        search = ShapeSearch(shape=shape)
+    search.start(parameters_space)
+    scheduler = _AsyncScheduler(
+        concurrency, context_class, search=search, **options)
+    _check_spawn_options(_spawn_process, scheduler.spawn_options)
+    if dedup_argv:
+        scheduler.argv_claims = {}
+    with contextlib.ExitStack() as stack:
+        if fixture is not None:
+            scheduler.spawn_options['fixture'] = stack.enter_context(
+                fixture.prepared())
+        scheduler.spawn_options['workdir'] = workdir
+        if limits is not None:
+            scheduler.spawn_options['limits'] = limits
+            share_best(stack.enter_context(limits.prepared()))
+            stack.callback(share_best, None)
+        async for completed in scheduler.run_async():
+            yield completed
+
+
+async def run_iter_async(
+        concurrency: int,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Async counterpart of `runner.run_iter`, supervising up to
+    `concurrency` processes from the running event loop.
+    Every context method may be a coroutine function.
+
+    Accepts `run_iter` options except tasks_per_process, mode and
+    placement, passing them raises TypeError. Working directories
+    are always temporary.
+    """
+    async for _, data in _run_indexed(
+            concurrency, context_class, parameters_space, shape, **options):
+        yield data
+
+
+async def run_async(
+        concurrency: int,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Returns data of every context in order of parameter space generation.
+    Accepts same options as `run_iter_async`.
+    """
+    data = {}
+    async for index, context_data in _run_indexed(
+            concurrency, context_class, parameters_space, shape, **options):
+        data[index] = context_data
+    return [data[index] for index in sorted(data)]
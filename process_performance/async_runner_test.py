@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for asyncio runner
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from process_performance.async_runner import run_async, run_iter_async
+from process_performance.cache import ResultCache
+from process_performance.context import InvokeContextInterface
+from process_performance.fixture import Fixture
+from process_performance.limits import Limits
+from process_performance.parameters import Parameters
+from process_performance.workdir import Workdir, WorkdirMode
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == 'win32',
+    reason='output is read by threads on windows, '
+    'event loop reading of pipes is tested on posix')
+
+
+# pylint: disable=invalid-overridden-method
+class InvokeContextAsync(InvokeContextInterface):
+    def __init__(self):
+        self.workdir = None
+        self.result = None
+        self.status_calls = 0
+
+    async def pre(self, workdir) -> None:
+        await asyncio.sleep(0)
+        self.workdir = workdir
+
+    async def post(self) -> None:
+        assert os.path.isdir(self.workdir)
+
+    async def success(self, result) -> None:
+        self.result = result
+
+    async def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c',
+                f'import time; time.sleep({args["delay"]}); '
+                f'print({args["delay"]})']
+
+    async def status(self, pid: int) -> None:
+        self.status_calls += 1
+
+    def data(self) -> dict:
+        return {
+            'stdout': self.result.stdout.decode().strip(),
+            'killed': self.result.killed,
+            'exit_code': self.result.exit_code,
+            'time_user': self.result.time_user,
+            'status_calls': self.status_calls,
+        }
+
+
+def test_run_async():
+    param_space = Parameters.from_dict({'delay': [0.2, 0.0]})
+
+    data = asyncio.run(run_async(
+        concurrency=2,
+        context_class=InvokeContextAsync,
+        parameters_space=param_space,
+    ))
+
+    assert [d['stdout'] for d in data] == ['0.2', '0.0']
+    assert [d['exit_code'] for d in data] == [0, 0]
+    assert all(d['status_calls'] > 0 for d in data)
+    if sys.platform.startswith('linux'):
+        assert all(d['time_user'] is not None for d in data)
+
+
+class InvokeContextAsyncFixture(InvokeContextAsync):
+    content: str = None
+
+    async def pre(self, workdir) -> None:
+        await super().pre(workdir)
+        with open(os.path.join(workdir, 'input'),
+                  encoding='utf-8') as input_file:
+            self.content = input_file.read()
+
+    def data(self) -> dict:
+        return {'content': self.content, 'workdir': self.workdir}
+
+
+def _build_fixture(directory):
+    with open(os.path.join(directory, 'input'), 'w',
+              encoding='utf-8') as input_file:
+        input_file.write('fixture')
+
+
+def test_run_async_fixture():
+    data = asyncio.run(run_async(
+        concurrency=2,
+        context_class=InvokeContextAsyncFixture,
+        parameters_space=Parameters.from_dict({'delay': [0, 0.1]}),
+        fixture=Fixture(build=_build_fixture),
+    ))
+
+    assert [d['content'] for d in data] == ['fixture', 'fixture']
+    assert not any(os.path.exists(d['workdir']) for d in data)
+
+
+def test_run_iter_async_concurrency():
+    param_space = Parameters.from_dict({
+        'delay': [0.5 + i / 1000 for i in range(16)]})
+
+    async def collect():
+        return [data async for data in run_iter_async(
+            concurrency=16,
+            context_class=InvokeContextAsync,
+            parameters_space=param_space,
+        )]
+
+    started = time.perf_counter()
+    data = asyncio.run(collect())
+
+    assert len(data) == 16
+    assert time.perf_counter() - started < 16 * 0.5 / 2
+
+
+def test_run_async_limits_and_cache(tmp_path):
+    param_space = Parameters.from_dict({'delay': [30.0, 0.0]})
+
+    with ResultCache(os.path.join(tmp_path, 'cache.sqlite')) as cache:
+        data = asyncio.run(run_async(
+            concurrency=2,
+            context_class=InvokeContextAsync,
+            parameters_space=param_space,
+            limits=Limits(wall_time=0.5),
+            cache=cache,
+        ))
+
+        assert [d['killed'] for d in data] == ['wall_time', None]
+        assert len(cache) == 1
+
+
+def test_run_async_workdir_reuse():
+    with pytest.raises(ValueError):
+        asyncio.run(run_async(
+            concurrency=1,
+            context_class=InvokeContextAsync,
+            parameters_space=Parameters.from_dict({'delay': [0]}),
+            workdir=Workdir(mode=WorkdirMode.REUSE),
+        ))
+
+
+@pytest.mark.parametrize('option', [
+    {'placement': None}, {'tasks_per_process': 1}, {'mode': None},
+    {'monitr': None}])
+def test_run_async_unexpected_option(option):
+    with pytest.raises(TypeError, match=next(iter(option))):
+        asyncio.run(run_async(
+            concurrency=1,
+            context_class=InvokeContextAsync,
+            parameters_space=Parameters.from_dict({'delay': [0]}),
+            **option,
+        ))
+
+
+def test_run_async_dedup_argv():
+    param_space = Parameters.from_dict({
+        'delay': [0.1, 0.2],
+        'unused': ['a', 'b', 'c'],
+    })
+
+    data = asyncio.run(run_async(
+        concurrency=6,
+        context_class=InvokeContextAsync,
+        parameters_space=param_space,
+        dedup_argv=True,
+    ))
+
+    assert len(data) == 6
+    assert sorted(d['stdout'] for d in data) == ['0.1'] * 3 + ['0.2'] * 3
+    assert len({id(d) for d in data}) == 2
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Persistent storage of collected data keyed by parameter point.
+    Allows to skip points already measured by previous runs.
+"""
+
+import hashlib
+import json
+import pickle
+import sqlite3
+
+
+class ResultCache():
+    """
+    SQLite backed storage of context data.
+
+    Key is a hash of canonical parameters dictionary,
+    context class name and optional salt, which should be changed
+    whenever measured executable or its environment changes.
+    """
+
+    def __init__(self, path: str, salt: str = ''):
+        self.salt = salt
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results '
+            '(key TEXT PRIMARY KEY, data BLOB NOT NULL)')
+        self._connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def key(self, params: dict, context_class: type) -> str:
+        canonical = json.dumps(
+            [self.salt,
+             f'{context_class.__module__}.{context_class.__qualname__}',
+             params],
+            sort_keys=True,
+            default=repr)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> tuple[bool, dict]:
+        """
+        Returns (True, data) if key is present, (False, None) otherwise.
+        """
+        row = self._connection.execute(
+            'SELECT data FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return False, None
+        return True, pickle.loads(row[0])
+
+    def put(self, key: str, data: dict) -> None:
+        with self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results (key, data) VALUES (?, ?)',
+                (key, pickle.dumps(data)))
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key)[0]
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM results').fetchone()[0]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for ResultCache class
+"""
+
+import os
+
+from process_performance.cache import ResultCache
+
+
+class ContextA():  # pylint: disable=too-few-public-methods
+    pass
+
+
+class ContextB():  # pylint: disable=too-few-public-methods
+    pass
+
+
+def test_key_is_canonical():
+    with ResultCache(':memory:') as cache:
+        assert cache.key({'a': 1, 'b': 2}, ContextA) == \
+            cache.key({'b': 2, 'a': 1}, ContextA)
+        assert cache.key({'a': 1}, ContextA) != \
+            cache.key({'a': 2}, ContextA)
+        assert cache.key({'a': 1}, ContextA) != \
+            cache.key({'a': 1}, ContextB)
+        assert cache.key({'a': 1}, ContextA) != \
+            ResultCache(':memory:', salt='v2').key({'a': 1}, ContextA)
+
+
+def test_get_put():
+    with ResultCache(':memory:') as cache:
+        key = cache.key({'a': 1}, ContextA)
+        assert cache.get(key) == (False, None)
+        assert key not in cache
+        cache.put(key, {'time': 1.5})
+        assert cache.get(key) == (True, {'time': 1.5})
+        assert key in cache
+        assert len(cache) == 1
+
+
+def test_persistence(tmp_path):
+    path = os.path.join(tmp_path, 'cache.sqlite')
+    with ResultCache(path) as cache:
+        key = cache.key({'a': 1}, ContextA)
+        cache.put(key, {'time': 1.5})
+    with ResultCache(path) as cache:
+        assert cache.get(key) == (True, {'time': 1.5})
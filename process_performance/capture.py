@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Subprocess output capture policies.
+    Keep large outputs out of memory and out of IPC pipes.
+"""
+
+import asyncio
+import contextlib
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from dataclasses import dataclass
+from enum import Enum
+
+_CHUNK = 64 * 1024
+
+
+class CaptureMode(Enum):
+    MEMORY = 0
+    DISCARD = 1
+    TAIL = 2
+    FILE = 3
+
+
+@dataclass
+class Capture:
+    """
+    Selects how one output stream of subprocess is captured.
+
+    MEMORY keeps whole output in InvokeResult.
+    DISCARD drops output, InvokeResult gets empty bytes.
+    TAIL keeps only last `limit` bytes.
+    FILE streams output to a file in `directory` (system temporary
+    directory by default), InvokeResult gets empty bytes and path
+    to the file, which is left for the caller to remove.
+    """
+    mode: CaptureMode = CaptureMode.MEMORY
+    limit: int = 64 * 1024
+    directory: str = None
+
+    def open(self, name: str) -> '_Stream':
+        return _Stream(self, name)
+
+
+class _Stream():
+    """
+    One captured stream of one subprocess.
+    """
+
+    def __init__(self, capture: Capture, name: str):
+        self.capture = capture
+        self.path = None
+        self._file = None
+        self._thread = None
+        self._buffer = bytearray()
+        if capture.mode == CaptureMode.FILE:
+            # pylint: disable=consider-using-with
+            self._file = tempfile.NamedTemporaryFile(
+                dir=capture.directory, prefix=f'{name}-', suffix='.log',
+                delete=False)
+            self.path = self._file.name
+
+    def target(self):
+        """
+        Value for subprocess.Popen stdout/stderr argument.
+        """
+        return {
+            CaptureMode.MEMORY: subprocess.PIPE,
+            CaptureMode.DISCARD: subprocess.DEVNULL,
+            CaptureMode.TAIL: subprocess.PIPE,
+            CaptureMode.FILE: self._file,
+        }[self.capture.mode]
+
+    def start(self, pipe) -> None:
+        """
+        Starts reading subprocess pipe if there is one.
+        """
+        if pipe is not None:
+            self._thread = threading.Thread(target=self._read, args=(pipe,))
+            self._thread.start()
+
+    def _read(self, pipe):
+        if self.capture.mode == CaptureMode.MEMORY:
+            self._buffer += pipe.read()
+            return
+        while chunk := pipe.read1(_CHUNK):
+            self._append(chunk)
+
+    def _append(self, chunk: bytes):
+        self._buffer += chunk
+        if self.capture.mode == CaptureMode.TAIL and \
+                len(self._buffer) > 2 * self.capture.limit:
+            del self._buffer[:len(self._buffer) - self.capture.limit]
+
+    async def read_async(self, pipe) -> None:
+        """
+        Reads subprocess pipe in running event loop if there is one,
+        alternative to `start` without reader thread. On windows
+        pipes of subprocess.Popen are not overlapped, event loop
+        can not read them, they are read in a thread instead.
+        """
+        if pipe is None:
+            return
+        if sys.platform == 'win32':
+            await asyncio.to_thread(self._read, pipe)
+            return
+        reader = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), pipe)
+        try:
+            while chunk := await reader.read(_CHUNK):
+                self._append(chunk)
+        finally:
+            transport.close()
+
+    def finish(self) -> bytes:
+        """
+        Waits for output to end, returns captured bytes.
+        """
+        if self._thread is not None:
+            self._thread.join()
+        if self._file is not None:
+            self._file.close()
+        if self.capture.mode == CaptureMode.TAIL:
+            start = max(0, len(self._buffer) - self.capture.limit)
+            return bytes(self._buffer[start:])
+        return bytes(self._buffer)
+
+    def abort(self) -> None:
+        """
+        Drops output file if subprocess failed to start.
+        """
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self.path)
+            self.path = None
+
+
+@contextlib.contextmanager
+def mapped(path: str):
+    """
+    Read-only memory-mapped view of captured output file.
+    """
+    with open(path, 'rb') as output_file:
+        if os.fstat(output_file.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(
+                output_file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
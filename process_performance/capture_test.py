@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for output capture policies
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from process_performance.capture import Capture, CaptureMode, mapped
+
+_OUTPUT_SIZE = 1024 * 1024
+_WRITER = (
+    'import sys\n'
+    f'sys.stdout.buffer.write(bytes(range(256)) * {_OUTPUT_SIZE // 256})\n'
+)
+_EXPECTED = bytes(range(256)) * (_OUTPUT_SIZE // 256)
+
+
+def _capture(capture: Capture) -> tuple[bytes, str]:
+    stream = capture.open('stdout')
+    with subprocess.Popen(
+            [sys.executable, '-c', _WRITER],
+            stdout=stream.target()) as process:
+        stream.start(process.stdout)
+        process.wait()
+        return stream.finish(), stream.path
+
+
+def test_memory():
+    assert _capture(Capture()) == (_EXPECTED, None)
+
+
+def test_discard():
+    assert _capture(Capture(mode=CaptureMode.DISCARD)) == (b'', None)
+
+
+@pytest.mark.parametrize("limit", [0, 1000, 100 * 1024])
+def test_tail(limit):
+    data, path = _capture(Capture(mode=CaptureMode.TAIL, limit=limit))
+    assert path is None
+    assert data == _EXPECTED[len(_EXPECTED) - limit:]
+
+
+@pytest.mark.parametrize("limit", [0, 1000])
+def test_tail_bounded(limit):
+    # pylint: disable=protected-access
+    stream = Capture(mode=CaptureMode.TAIL, limit=limit).open('stdout')
+    for _ in range(100):
+        stream._append(b'x' * 1000)
+        assert len(stream._buffer) <= 2 * limit + 1000
+    assert stream.finish() == b'x' * limit
+
+
+def test_file(tmp_path):
+    data, path = _capture(Capture(
+        mode=CaptureMode.FILE, directory=str(tmp_path)))
+    assert data == b''
+    assert os.path.dirname(path) == str(tmp_path)
+    with mapped(path) as view:
+        assert view[:] == _EXPECTED
+
+
+def test_file_abort(tmp_path):
+    stream = Capture(mode=CaptureMode.FILE, directory=str(tmp_path)).open(
+        'stdout')
+    stream.abort()
+    assert not os.listdir(tmp_path)
+
+
+def test_mapped_empty(tmp_path):
+    path = os.path.join(tmp_path, 'empty')
+    with open(path, 'wb'):
+        pass
+    with mapped(path) as view:
+        assert view == b''
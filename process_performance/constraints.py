@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Declarative constraints on parameter combinations.
+    Constraint is a function receiving params dict of a point
+    and returning False for points which must not be run.
+"""
+
+from typing import Callable
+
+
+def forbid(**values: list) -> Callable[[dict], bool]:
+    """
+    Rejects points where every named parameter has one of listed values,
+    like forbid(cc=['clang'], flag=['-fno-semantic-interposition']).
+    Parameters left out of the point never match.
+    """
+    def constraint(params: dict) -> bool:
+        return not all(
+            name in params and params[name] in allowed
+            for name, allowed in values.items())
+    return constraint
+
+
+def resolve(parameters: list, constraints: list, indexes: tuple) -> dict:
+    """
+    Params dict of point given by value indexes of parameters,
+    conditional parameters which are not active are left out.
+    Returns None if point violates a constraint.
+    """
+    params = {}
+    for parameter, index in zip(parameters, indexes):
+        if parameter.active(params):
+            params[parameter.name] = parameter.values[index]
+    if all(constraint(params) for constraint in constraints):
+        return params
+    return None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for constraints and conditional parameters
+"""
+
+import pytest
+
+from process_performance.constraints import forbid
+from process_performance.parameter import Parameter
+from process_performance.parameters import Parameters
+from process_performance.shape import ParameterSpaceShape
+
+
+def _xz_parameters(**kwargs):
+    return Parameters.from_dict({
+        'preset': [0, 1, 6, 9],
+        'extreme': [False, True],
+        'threads': [1, 2],
+    }, **kwargs)
+
+
+def test_forbid():
+    constraint = forbid(preset=[0, 1], extreme=[True])
+
+    assert not constraint({'preset': 0, 'extreme': True})
+    assert constraint({'preset': 6, 'extreme': True})
+    assert constraint({'preset': 0, 'extreme': False})
+    assert constraint({'preset': 0})
+
+
+@pytest.mark.parametrize('shape', list(ParameterSpaceShape))
+def test_constraints_prune(shape):
+    constraint = forbid(preset=[0, 1], extreme=[True])
+    full = list(_xz_parameters().gen(shape)())
+    parameters = _xz_parameters(constraints=[constraint])
+
+    pruned = list(parameters.gen(shape)())
+
+    assert pruned == [point for point in full if constraint(point)]
+    assert parameters.count(shape) == len(pruned)
+
+
+def test_conditional_parameter():
+    parameters = _xz_parameters(conditions={
+        'extreme': {'preset': [6, 9]},
+        'threads': lambda params: params.get('extreme', False)})
+
+    points = list(parameters.gen(ParameterSpaceShape.CUBE)())
+
+    assert sorted(points, key=lambda p: tuple(p.values())) == [
+        {'preset': 0},
+        {'preset': 1},
+        {'preset': 6, 'extreme': False},
+        {'preset': 6, 'extreme': True, 'threads': 1},
+        {'preset': 6, 'extreme': True, 'threads': 2},
+        {'preset': 9, 'extreme': False},
+        {'preset': 9, 'extreme': True, 'threads': 1},
+        {'preset': 9, 'extreme': True, 'threads': 2},
+    ]
+
+
+def test_conditional_edges():
+    parameters = Parameters.from_dict({
+        'a': [0, 1],
+        'c': [1, 2, 3],
+        'd': [1, 2, 3],
+    }, conditions={'c': {'a': [0]}, 'd': {'a': [0]}})
+    space = parameters.space(ParameterSpaceShape.EDGES)
+
+    points = list(space)
+
+    # both edge blocks reduce points of a == 1 to the same one
+    assert points == [
+        {'a': 0, 'c': 2, 'd': 1},
+        {'a': 0, 'c': 2, 'd': 3},
+        {'a': 1},
+        {'a': 0, 'c': 1, 'd': 2},
+        {'a': 0, 'c': 3, 'd': 2},
+    ]
+    assert len(space) == len(points)
+    assert parameters.count(ParameterSpaceShape.EDGES) == len(points)
+
+
+def test_active():
+    assert Parameter('x', [1]).active({})
+    assert Parameter('x', [1], when={'y': [2]}).active({'y': 2})
+    assert not Parameter('x', [1], when={'y': [2]}).active({'y': 3})
+    assert not Parameter('x', [1], when={'y': [2]}).active({})
@@ -4,24 +4,52 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
+from process_performance.sampler import Samples
 
+
+# pylint: disable=too-many-instance-attributes
 @dataclass
 class InvokeResult:
+    """
+    Subprocess exit code, output and resource usage.
+    Output paths are set when output is captured to files.
+    `killed` is name of exceeded limit when process was killed by runner.
+    `timings` are durations of launch phases, see `progress.PHASES`.
+    `samples` is resource usage time series when runner has a Sampler.
+    Usage fields include descendants of subprocess, see `ProcessTree`,
+    they are None when platform does not provide them,
+    times are in seconds, sizes in bytes.
+    """
     exit_code: int
-    stdout: str
-    stderr: str
+    stdout: bytes
+    stderr: bytes
+    stdout_path: str = None
+    stderr_path: str = None
+    time_wall: float = None
+    time_user: float = None
+    time_system: float = None
+    max_rss: int = None
+    ctx_switches_voluntary: int = None
+    ctx_switches_involuntary: int = None
+    read_bytes: int = None
+    write_bytes: int = None
+    killed: str = None
+    timings: dict = None
+    samples: Samples = None
 
 
 class InvokeContextInterface(ABC):
     '''
         A class responsible for preparing, formatting command,
         cleaning up and data collection for subprocess.
+        Methods may be coroutine functions when run by async_runner.
     '''
     @abstractmethod
     def pre(self, workdir: str) -> None:
         '''
             Called right before process spawns,
-            receives directory process will start in
+            receives directory process will start in,
+            fixture files, if any, are already placed there
         '''
 
     @abstractmethod
@@ -35,7 +63,8 @@ class InvokeContextInterface(ABC):
     def success(self, result: InvokeResult) -> None:
         '''
             Called once subprocess return code is collected,
-            receives result object containing return code, stdout and stderr
+            receives result object containing return code, stdout, stderr
+            and resource usage of the process
         '''
 
     @abstractmethod
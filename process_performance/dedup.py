@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Deduplication of processes by their command line.
+    Points rendering to the same argv are run once.
+"""
+
+_WORKDIR = '{workdir}'
+
+
+class DuplicateArgvException(Exception):
+    """
+    Raised instead of spawning process whose command line
+    is already run for point number `owner`.
+    """
+
+    def __init__(self, owner: int):
+        super().__init__(owner)
+        self.owner = owner
+
+
+def canonical_argv(argv: list, workdir: str) -> tuple:
+    """
+    Command line with working directory replaced by placeholder,
+    so it compares equal across processes.
+    """
+    return tuple(str(arg).replace(workdir, _WORKDIR) for arg in argv)
+
+
+def claim(claims, argv: list, workdir: str, claim_id: int) -> None:
+    """
+    Registers command line for point number `claim_id` in `claims`,
+    dict shared by all workers of one run.
+    """
+    owner = claims.setdefault(canonical_argv(argv, workdir), claim_id)
+    if owner != claim_id:
+        raise DuplicateArgvException(owner)
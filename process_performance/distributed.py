@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Distributed runs: coordinator hands out leased parameter points,
+    workers on any number of hosts run them and send back context data.
+    Messages are pickled, transports must only be used between trusted
+    hosts.
+"""
+
+import collections
+import contextlib
+import glob
+import itertools
+import multiprocessing.connection
+import os
+import pickle
+import shutil
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from process_performance.fixture import Fixture
+from process_performance.limits import Limits, share_best
+from process_performance.mode import ExecutionMode
+from process_performance.parameters import Parameters
+from process_performance.runner import _LocalTask, _Point, _Scheduler, \
+    _run_local
+from process_performance.search import SearchStrategy, ShapeSearch
+from process_performance.shape import ParameterSpaceShape
+from process_performance.workdir import Workdir
+
+# how often idle workers ask for work and coordinator checks leases
+_POLL_INTERVAL = 0.05
+
+
+def _write_message(path: str, message: dict) -> None:
+    # rename makes message appear complete to the reader
+    partial = path + '.partial'
+    with open(partial, 'wb') as message_file:
+        pickle.dump(message, message_file)
+    os.rename(partial, path)
+
+
+def _read_message(path: str) -> dict:
+    with open(path, 'rb') as message_file:
+        message = pickle.load(message_file)
+    os.unlink(path)
+    return message
+
+
+class _DirectoryServer():
+    def __init__(self, path: str):
+        self.path = path
+        self._requests = os.path.join(path, 'requests')
+        self._replies = os.path.join(path, 'replies')
+        stopped = os.path.join(path, 'stopped')
+        # messages left by workers of previous run, which stopped
+        # once it did; without marker pending requests may come
+        # from workers started before this coordinator
+        if os.path.exists(stopped):
+            shutil.rmtree(self._requests, ignore_errors=True)
+            shutil.rmtree(self._replies, ignore_errors=True)
+            os.unlink(stopped)
+        os.makedirs(self._requests, exist_ok=True)
+        os.makedirs(self._replies, exist_ok=True)
+
+    def receive(self, timeout: float) -> list[tuple[str, dict]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            paths = sorted(glob.glob(os.path.join(self._requests, '*.msg')))
+            if paths or time.monotonic() >= deadline:
+                break
+            time.sleep(min(_POLL_INTERVAL, timeout))
+        return [(os.path.basename(path), _read_message(path))
+                for path in paths]
+
+    def reply(self, client: str, message: dict) -> None:
+        _write_message(os.path.join(self._replies, client), message)
+
+    def close(self) -> None:
+        with open(os.path.join(self.path, 'stopped'), 'wb'):
+            pass
+
+
+class _DirectoryClient():
+    def __init__(self, path: str):
+        self.path = path
+        self._name = uuid.uuid4().hex
+        # worker may start before coordinator
+        os.makedirs(os.path.join(path, 'requests'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'replies'), exist_ok=True)
+        self._calls = itertools.count()
+
+    def call(self, message: dict) -> dict:
+        name = f'{self._name}-{next(self._calls):08d}.msg'
+        _write_message(os.path.join(self.path, 'requests', name), message)
+        reply = os.path.join(self.path, 'replies', name)
+        while not os.path.exists(reply):
+            if os.path.exists(os.path.join(self.path, 'stopped')):
+                raise ConnectionError('coordinator stopped')
+            time.sleep(_POLL_INTERVAL)
+        return _read_message(reply)
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass
+class DirectoryTransport:
+    """
+    Exchanges messages as files in directory shared by all hosts,
+    like NFS mount, or local directory for workers on one host.
+    """
+    path: str
+
+    def serve(self) -> _DirectoryServer:
+        return _DirectoryServer(self.path)
+
+    def connect(self) -> _DirectoryClient:
+        return _DirectoryClient(self.path)
+
+
+class _TcpServer():
+    def __init__(self, address: tuple, authkey: bytes):
+        self._listener = multiprocessing.connection.Listener(
+            address, authkey=authkey)
+        self.address = self._listener.address
+        self._authkey = authkey
+        self._connections = []
+        self._lock = threading.Lock()
+        self._closed = False
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                connection = self._listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                continue
+            with self._lock:
+                self._connections.append(connection)
+
+    def receive(self, timeout: float) -> list[tuple[object, dict]]:
+        with self._lock:
+            connections = list(self._connections)
+        if not connections:
+            time.sleep(min(_POLL_INTERVAL, timeout))
+            return []
+        messages = []
+        for connection in multiprocessing.connection.wait(
+                connections, min(_POLL_INTERVAL, timeout)):
+            try:
+                messages.append((connection, connection.recv()))
+            except (EOFError, OSError):
+                with self._lock:
+                    self._connections.remove(connection)
+        return messages
+
+    def reply(self, client, message: dict) -> None:
+        with contextlib.suppress(OSError):
+            client.send(message)
+
+    def close(self) -> None:
+        self._closed = True
+        # wake up accept() blocked in listener
+        with contextlib.suppress(OSError, EOFError):
+            multiprocessing.connection.Client(
+                self.address, authkey=self._authkey).close()
+        self._listener.close()
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+
+class _TcpClient():
+    def __init__(self, address: tuple, authkey: bytes, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._connection = multiprocessing.connection.Client(
+                    address, authkey=authkey)
+                break
+            except ConnectionRefusedError:
+                # coordinator may not be listening yet
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(_POLL_INTERVAL)
+
+    def call(self, message: dict) -> dict:
+        try:
+            self._connection.send(message)
+            return self._connection.recv()
+        except (EOFError, OSError) as exc:
+            raise ConnectionError('coordinator stopped') from exc
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+@dataclass
+class TcpTransport:
+    """
+    Exchanges messages over TCP, coordinator listens on `address`,
+    port 0 picks free port, see `address` of object returned by `serve`.
+    Workers retry connecting for `timeout` seconds.
+
+    Peers authenticate with `authkey`, a secret shared by coordinator
+    and workers, like `secrets.token_bytes()` passed out of band.
+    Messages are pickled, anyone knowing the key can run code
+    on coordinator and workers.
+    """
+    authkey: bytes
+    address: tuple = ('127.0.0.1', 0)
+    timeout: float = 30.0
+
+    def __post_init__(self):
+        if not isinstance(self.authkey, bytes) or not self.authkey:
+            raise TypeError('TcpTransport authkey must be non-empty bytes')
+
+    def serve(self) -> _TcpServer:
+        return _TcpServer(self.address, self.authkey)
+
+    def connect(self) -> _TcpClient:
+        return _TcpClient(self.address, self.authkey, self.timeout)
+
+
+@dataclass
+class Leases:
+    """
+    Every point is leased to one worker, which must send heartbeat
+    at least every `timeout` seconds. Point of expired lease, like one
+    of a died worker, is leased again, up to `attempts` times in total.
+    Then it fails: its context receives ExpiredException in `error`
+    and its data is returned as data of a failed point.
+    """
+    timeout: float = 30.0
+    attempts: int = 3
+
+    class ExpiredException(RuntimeError):
+        """ExpiredException"""
+
+
+@dataclass
+class _Lease:
+    task: _LocalTask
+    attempt: int
+    deadline: float
+
+
+class _Coordinator(_Scheduler):
+    """
+    Scheduler queueing submitted points for workers to lease.
+    """
+
+    def __init__(
+            self,
+            workers: int,
+            context_class: type,
+            leases: Leases,
+            **options):
+        super().__init__(
+            workers, context_class, mode=ExecutionMode.LOCAL, **options)
+        if self.spawn_options:
+            raise TypeError(
+                f'unexpected options {", ".join(sorted(self.spawn_options))}'
+                ', processes are run by workers, '
+                'give spawn options to serve_worker')
+        self.leases = leases
+        # (task, attempt) waiting for worker
+        self._queued = collections.deque()
+        # lease id -> lease, ids are unique across runs, so results
+        # sent to previous coordinator are not taken for this one's
+        self._leased = {}
+
+    def _submit(self, point: _Point):
+        self._queued.append((_LocalTask(point, self._done), 1))
+        self._in_flight += 1
+
+    def _handle(self, message: dict) -> dict:
+        now = time.monotonic()
+        lease = self._leased.get(message.get('lease'))
+        if message['type'] == 'request':
+            if not self._queued:
+                return {'type': 'wait', 'delay': _POLL_INTERVAL}
+            task, attempt = self._queued.popleft()
+            lease_id = uuid.uuid4().hex
+            self._leased[lease_id] = _Lease(
+                task, attempt, now + self.leases.timeout)
+            return {
+                'type': 'lease',
+                'lease': lease_id,
+                'params': task.point.params,
+                'timeout': self.leases.timeout,
+            }
+        if message['type'] == 'heartbeat' and lease is not None:
+            lease.deadline = now + self.leases.timeout
+        elif message['type'] == 'result' and lease is not None:
+            del self._leased[message['lease']]
+            lease.task.success((
+                message['failed'], message['data'], message.get('report')))
+        # late result of expired lease is dropped
+        return {'type': 'ok'}
+
+    def _expire(self):
+        now = time.monotonic()
+        for lease_id, lease in list(self._leased.items()):
+            if lease.deadline > now:
+                continue
+            del self._leased[lease_id]
+            if lease.attempt < self.leases.attempts:
+                self._queued.appendleft((lease.task, lease.attempt + 1))
+                continue
+            self._fail(lease.task, Leases.ExpiredException(
+                f'lease of {lease.task.point.params} expired '
+                f'{lease.attempt} times'))
+
+    def _fail(self, task: _LocalTask, exception: Exception):
+        """
+        Completes task as failed point, like `_run_local` does
+        for failed spawn, other points keep running.
+        """
+        context = self.context_class()
+        context.error(exception)
+        task.success((True, context.data(), {'error': repr(exception)}))
+
+    def serve(self, server):
+        self._start()
+        try:
+            while True:
+                yield from self._propose()
+                if not self._in_flight:
+                    break
+                while self._done.empty():
+                    for client, message in server.receive(_POLL_INTERVAL):
+                        server.reply(client, self._handle(message))
+                    self._expire()
+                    self._tick()
+                yield from self._completed(self._done.get())
+        finally:
+            self._stop()
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def _run_indexed(
+        transport,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape,
+        workers: int = 8,
+        search: SearchStrategy = None,
+        leases: Leases = Leases(),
+        **options):
+    if search is None:
+        search = ShapeSearch(shape=shape)
+    search.start(parameters_space)
+    coordinator = _Coordinator(
+        workers, context_class, leases, search=search, **options)
+    server = transport.serve()
+    try:
+        yield from coordinator.serve(server)
+    finally:
+        server.close()
+
+
+def run_distributed_iter(
+        transport,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Coordinates run of workers started by `serve_worker` with same
+    `transport` and `context_class`, yields data of every context
+    in order of completion. Workers exit once the run finishes.
+
+    Options:
+        workers: expected number of workers, at most
+            `workers * tasks_per_process` points are leased at once.
+        leases: Leases, heartbeat timeout and retries of lost points.
+        tasks_per_process, cache, search, trials, progress, sinks:
+            as in `run_iter`.
+    Spawn options like monitor, workdir or limits are given
+    to `serve_worker`, passing them here raises TypeError.
+    """
+    for _, data in _run_indexed(
+            transport, context_class, parameters_space, shape, **options):
+        yield data
+
+
+def run_distributed(
+        transport,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Returns data of every context in order of parameter space generation.
+    Accepts same options as `run_distributed_iter`.
+    """
+    data = {}
+    for index, context_data in _run_indexed(
+            transport, context_class, parameters_space, shape, **options):
+        data[index] = context_data
+    return [data[index] for index in sorted(data)]
+
+
+def _heartbeat(call, lease: dict, stop: threading.Event):
+    while not stop.wait(lease['timeout'] / 3):
+        try:
+            call({'type': 'heartbeat', 'lease': lease['lease']})
+        except ConnectionError:
+            return
+
+
+# pylint: disable=too-many-locals
+def serve_worker(
+        transport,
+        context_class: type,
+        fixture: Fixture = None,
+        workdir: Workdir = Workdir(),
+        limits: Limits = None,
+        **spawn_options) -> None:
+    """
+    Runs leased points one by one until coordinator stops.
+    Start as many workers per host as it has cores to spare.
+
+    Accepts spawn options of `run_iter`: monitor, stdout, stderr,
+    sampler, tree, fixture, workdir and limits, relative limit compares
+    to processes of this worker only.
+    """
+    worker = f'{socket.gethostname()}-{os.getpid()}'
+    with contextlib.ExitStack() as stack:
+        if fixture is not None:
+            spawn_options['fixture'] = stack.enter_context(
+                fixture.prepared())
+        spawn_options['workdir'] = stack.enter_context(workdir.prepared())
+        if limits is not None:
+            spawn_options['limits'] = limits
+            share_best(stack.enter_context(limits.prepared()))
+            stack.callback(share_best, None)
+        client = stack.enter_context(contextlib.closing(transport.connect()))
+        lock = threading.Lock()
+
+        def call(message: dict) -> dict:
+            # heartbeats are sent from another thread
+            with lock:
+                return client.call(message)
+
+        while True:
+            try:
+                lease = call({'type': 'request', 'worker': worker})
+                if lease['type'] == 'wait':
+                    time.sleep(lease['delay'])
+                    continue
+                stop = threading.Event()
+                heartbeat = threading.Thread(
+                    target=_heartbeat, args=(call, lease, stop), daemon=True)
+                heartbeat.start()
+                try:
+                    failed, data, report = _run_local(
+                        context_class, lease['params'], spawn_options)
+                finally:
+                    stop.set()
+                    heartbeat.join()
+                call({
+                    'type': 'result',
+                    'lease': lease['lease'],
+                    'failed': failed,
+                    'data': data,
+                    'report': report,
+                })
+            except ConnectionError:
+                return
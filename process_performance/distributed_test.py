@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for distributed runs with local workers
+"""
+
+import multiprocessing
+import os
+import pickle
+import secrets
+import socket
+import sys
+import threading
+
+import pytest
+
+from process_performance.context import InvokeContextInterface
+from process_performance.distributed import DirectoryTransport, Leases, \
+    TcpTransport, run_distributed, serve_worker
+from process_performance.limits import Limits
+from process_performance.parameters import Parameters
+
+
+class InvokeContextWorker(InvokeContextInterface):
+    def __init__(self):
+        self.stdout = None
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.stdout = result.stdout.decode().strip()
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        crash = args.get('crash')
+        if crash is not None and not os.path.exists(crash):
+            # first worker leasing this point dies
+            with open(crash, 'w', encoding='utf-8'):
+                pass
+            os._exit(1)  # pylint: disable=protected-access
+        return [sys.executable, '-c', f'print({args["point"]})']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'stdout': self.stdout,
+            'worker': os.getpid(),
+        }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start_workers(transport, count: int) -> list:
+    workers = [
+        multiprocessing.Process(
+            target=serve_worker, args=(transport, InvokeContextWorker))
+        for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+@pytest.mark.parametrize('transport_type', ['directory', 'tcp'])
+def test_run_distributed(tmp_path, transport_type):
+    if transport_type == 'directory':
+        transport = DirectoryTransport(str(tmp_path))
+    else:
+        transport = TcpTransport(
+            secrets.token_bytes(), address=('127.0.0.1', _free_port()))
+    workers = _start_workers(transport, 2)
+
+    data = run_distributed(
+        transport,
+        InvokeContextWorker,
+        Parameters.from_dict({'point': list(range(8))}),
+        workers=2,
+    )
+
+    for worker in workers:
+        worker.join(timeout=10)
+        assert worker.exitcode == 0
+    assert sorted(int(d['stdout']) for d in data) == list(range(8))
+    assert {d['worker'] for d in data} <= {w.pid for w in workers}
+
+
+def test_run_distributed_worker_dies(tmp_path):
+    transport = DirectoryTransport(os.path.join(tmp_path, 'transport'))
+    workers = _start_workers(transport, 2)
+
+    data = run_distributed(
+        transport,
+        InvokeContextWorker,
+        Parameters.from_dict({
+            'point': [1],
+            'crash': [os.path.join(tmp_path, 'crashed')],
+        }),
+        leases=Leases(timeout=0.5),
+    )
+
+    for worker in workers:
+        worker.join(timeout=10)
+    assert data[0]['stdout'] == '1'
+    assert sorted(w.exitcode for w in workers) == [0, 1]
+
+
+def test_run_distributed_lease_attempts(tmp_path):
+    transport = DirectoryTransport(str(tmp_path))
+    # worker leasing first point and never reporting back
+    abandon = threading.Thread(target=transport.connect().call, args=(
+        {'type': 'request', 'worker': 'abandoning'},), daemon=True)
+    abandon.start()
+    workers = []
+
+    def start_worker():
+        abandon.join(timeout=10)
+        workers.extend(_start_workers(transport, 1))
+
+    starter = threading.Thread(target=start_worker, daemon=True)
+    starter.start()
+    data = run_distributed(
+        transport,
+        InvokeContextWorker,
+        Parameters.from_dict({'point': [1, 2]}),
+        leases=Leases(timeout=0.1, attempts=1),
+    )
+    starter.join(timeout=10)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    # failed point, context received error in coordinator
+    assert data[0] == {'stdout': None, 'worker': os.getpid()}
+    assert data[1]['stdout'] == '2'
+
+
+def test_run_distributed_rejects_spawn_options(tmp_path):
+    with pytest.raises(TypeError, match='serve_worker'):
+        run_distributed(
+            DirectoryTransport(str(tmp_path)),
+            InvokeContextWorker,
+            Parameters.from_dict({'point': [1]}),
+            limits=Limits(wall_time=0.2),
+        )
+
+
+def test_directory_transport_clears_stopped_run(tmp_path):
+    transport = DirectoryTransport(str(tmp_path))
+    transport.serve().close()
+    # result of worker which did not see previous run stop
+    (tmp_path / 'requests' / 'stale.msg').write_bytes(
+        pickle.dumps({'type': 'result', 'lease': 0}))
+    (tmp_path / 'replies' / 'stale.msg').write_bytes(
+        pickle.dumps({'type': 'ok'}))
+
+    server = transport.serve()
+
+    assert server.receive(0) == []
+    assert not os.listdir(tmp_path / 'replies')
+    assert not (tmp_path / 'stopped').exists()
+    server.close()
+
+
+def test_tcp_transport_requires_authkey():
+    with pytest.raises(TypeError):
+        TcpTransport()  # pylint: disable=no-value-for-parameter
+    with pytest.raises(TypeError):
+        TcpTransport(b'')
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Input files prepared once per run
+    and materialised into every process working directory.
+"""
+
+import contextlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# linux ioctl cloning file extents (copy-on-write copy)
+_FICLONE = 0x40049409
+
+
+class LinkMode(Enum):
+    HARDLINK = 0
+    SYMLINK = 1
+    COPY = 2
+    REFLINK = 3
+
+
+def _copy(source: str, target: str):
+    shutil.copy2(source, target)
+
+
+def _hardlink(source: str, target: str):
+    try:
+        os.link(source, target)
+    except OSError:
+        _copy(source, target)
+
+
+def _symlink(source: str, target: str):
+    os.symlink(source, target)
+
+
+def _reflink(source: str, target: str):
+    if fcntl is not None:
+        try:
+            with open(source, 'rb') as source_file, \
+                    open(target, 'wb') as target_file:
+                fcntl.ioctl(target_file.fileno(), _FICLONE,
+                            source_file.fileno())
+            shutil.copystat(source, target)
+            return
+        except OSError:
+            pass
+    _copy(source, target)
+
+
+_LINKERS = {
+    LinkMode.HARDLINK: _hardlink,
+    LinkMode.SYMLINK: _symlink,
+    LinkMode.COPY: _copy,
+    LinkMode.REFLINK: _reflink,
+}
+
+
+@dataclass
+class PreparedFixture:
+    """
+    Directory with built fixture files, sent to pool workers.
+    """
+    path: str
+    link: LinkMode
+
+    def materialize(self, workdir: str) -> None:
+        """
+        Recreates fixture tree in workdir linking every file.
+        """
+        link = _LINKERS[self.link]
+        for root, dirs, files in os.walk(self.path):
+            target_root = os.path.normpath(
+                os.path.join(workdir, os.path.relpath(root, self.path)))
+            for name in dirs:
+                os.makedirs(os.path.join(target_root, name), exist_ok=True)
+            for name in files:
+                link(os.path.join(root, name), os.path.join(target_root, name))
+
+
+@dataclass
+class Fixture:
+    """
+    Input files built once per run by `build(directory)` and
+    placed into working directory of every process before `pre`.
+
+    REFLINK (default) makes copy-on-write clone where filesystem
+    supports it, so process may modify its input, and falls back
+    to COPY elsewhere. HARDLINK and SYMLINK are the cheapest, but process
+    modifying its input modifies it for every following process too,
+    and some tools refuse hardlinked or symlinked inputs.
+    HARDLINK falls back to COPY when linking fails.
+    """
+    build: Callable[[str], None]
+    link: LinkMode = LinkMode.REFLINK
+
+    @contextlib.contextmanager
+    def prepared(self):
+        with tempfile.TemporaryDirectory(prefix='fixture-') as fixturedir:
+            self.build(fixturedir)
+            yield PreparedFixture(path=fixturedir, link=self.link)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Fixture class
+"""
+
+import os
+
+import pytest
+
+from process_performance.fixture import Fixture, LinkMode
+
+
+def _build(directory):
+    os.makedirs(os.path.join(directory, 'sub'))
+    with open(os.path.join(directory, 'input'), 'wb') as input_file:
+        input_file.write(b'input data')
+    with open(os.path.join(directory, 'sub', 'nested'), 'wb') as nested:
+        nested.write(b'nested data')
+
+
+def _read(path):
+    with open(path, 'rb') as data_file:
+        return data_file.read()
+
+
+@pytest.mark.parametrize("link", list(LinkMode))
+def test_materialize(tmp_path, link):
+    with Fixture(build=_build, link=link).prepared() as prepared:
+        for workdir in ['a', 'b']:
+            workdir = os.path.join(tmp_path, workdir)
+            os.makedirs(workdir)
+            prepared.materialize(workdir)
+            assert _read(os.path.join(workdir, 'input')) == b'input data'
+            assert _read(os.path.join(workdir, 'sub', 'nested')) == \
+                b'nested data'
+
+            source = os.path.join(prepared.path, 'input')
+            target = os.path.join(workdir, 'input')
+            assert os.path.islink(target) == (link == LinkMode.SYMLINK)
+            if link == LinkMode.HARDLINK:
+                assert os.path.samefile(source, target)
+            if link in [LinkMode.COPY, LinkMode.REFLINK]:
+                assert not os.path.samefile(source, target)
+
+
+def test_default_isolates_inputs(tmp_path):
+    with Fixture(build=_build).prepared() as prepared:
+        prepared.materialize(str(tmp_path))
+        # tool rewriting its input in place
+        with open(os.path.join(tmp_path, 'input'), 'r+b') as data_file:
+            data_file.write(b'output')
+        assert _read(os.path.join(prepared.path, 'input')) == b'input data'
+
+
+def test_prepared_cleanup():
+    with Fixture(build=_build).prepared() as prepared:
+        assert os.path.isdir(prepared.path)
+    assert not os.path.exists(prepared.path)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Launch of one subprocess: spawning it, collecting its result
+    and phase timings. Shared by runner and async runner, which differ
+    only in how context methods are called and how exit is waited for.
+"""
+
+import subprocess
+import time
+
+from process_performance.capture import Capture
+from process_performance.context import InvokeResult
+from process_performance.limits import Limits
+from process_performance.sampler import Sampler
+from process_performance.tree import ProcessTree
+
+
+# pylint: disable=too-many-instance-attributes
+class _Launch():
+    """
+    Phases of launch: setup until `spawn`, spawn, monitoring until
+    `reap` and teardown until `timings`, working directory cleanup
+    included.
+    """
+
+    def __init__(self):
+        self._setup_started = time.perf_counter()
+        self.started = None
+        self._spawned = None
+        self._exited = None
+        self.process = None
+        self.stdout = None
+        self.stderr = None
+        self._group = None
+        self._recording = None
+        self._samples = None
+        self._usage = None
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def spawn(
+            self,
+            argv: list,
+            cwd: str,
+            stdout: Capture,
+            stderr: Capture,
+            tree: ProcessTree,
+            sampler: Sampler,
+            read: bool = True):
+        """
+        Starts process, its sampler and, with `read`,
+        threads reading its output. Returns the process.
+        """
+        self.stdout = stdout.open('stdout')
+        self.stderr = stderr.open('stderr')
+        self.started = time.perf_counter()
+        try:
+            # pylint: disable=consider-using-with
+            self.process = subprocess.Popen(
+                args=argv,
+                cwd=cwd,
+                bufsize=-1,
+                stdout=self.stdout.target(),
+                stderr=self.stderr.target(),
+                **tree.popen_options()
+            )
+        except BaseException:
+            self.stdout.abort()
+            self.stderr.abort()
+            raise
+        self._group = tree.track(self.process)
+        if read:
+            self.stdout.start(self.process.stdout)
+            self.stderr.start(self.process.stderr)
+        if sampler is not None:
+            self._recording = sampler.start(self.process.pid, self.started)
+        self._spawned = time.perf_counter()
+        return self.process
+
+    def reap(self) -> None:
+        """
+        Called once watching ends, even if it failed: stops sampling,
+        kills process group and reaps the process.
+        """
+        self._exited = time.perf_counter()
+        if self._recording is not None:
+            self._samples = self._recording.stop()
+        # leftover descendants would keep output pipes open
+        self._usage = self._group.reap()
+
+    def result(self, killed: str, limits: Limits) -> InvokeResult:
+        """
+        Result of reaped process, waits for its output.
+        """
+        time_wall = self._exited - self.started
+        if limits is not None and killed is None and \
+                self.process.returncode == 0:
+            limits.record(time_wall)
+        stdout_data = self.stdout.finish()
+        stderr_data = self.stderr.finish()
+        return InvokeResult(
+            exit_code=self.process.returncode,
+            stdout=stdout_data,
+            stderr=stderr_data,
+            stdout_path=self.stdout.path,
+            stderr_path=self.stderr.path,
+            time_wall=time_wall,
+            killed=killed,
+            samples=self._samples,
+            **self._usage,
+        )
+
+    def timings(self) -> dict:
+        """
+        Phase timings in seconds, call once working directory is gone.
+        """
+        return {
+            'setup': self.started - self._setup_started,
+            'spawn': self._spawned - self.started,
+            'monitor': self._exited - self._spawned,
+            'teardown': time.perf_counter() - self._exited,
+        }
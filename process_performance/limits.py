@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Per-process time limits enforced by the monitor.
+"""
+
+import contextlib
+import math
+import multiprocessing
+from dataclasses import dataclass
+
+import psutil
+
+# best wall time of runs completed so far, shared by pool workers
+_best_wall_time = None  # pylint: disable=invalid-name
+
+
+def share_best(best) -> None:
+    """
+    Called in pool worker with value created by `Limits.prepared`.
+    """
+    global _best_wall_time  # pylint: disable=global-statement
+    _best_wall_time = best
+
+
+def _cpu_time(pid: int) -> float:
+    """
+    CPU time of process, its waited for and running descendants.
+    """
+    try:
+        process = psutil.Process(pid)
+        tree = [process] + process.children(recursive=True)
+    except psutil.Error:
+        return 0.0
+    total = 0.0
+    for member in tree:
+        try:
+            times = member.cpu_times()
+        except psutil.Error:
+            continue
+        total += sum(getattr(times, name, 0.0) for name in (
+            'user', 'system', 'children_user', 'children_system'))
+    return total
+
+
+@dataclass
+class Limits:
+    """
+    Kills process once it runs longer than `wall_time` seconds
+    or it and its descendants use more than `cpu_time` seconds of CPU.
+
+    With `relative` set, process is killed once its wall time exceeds
+    `relative` times wall time of the fastest successful process
+    of the run so far, it can not be better than that one anyway.
+
+    Killed processes have InvokeResult.killed set to the limit name.
+    """
+    wall_time: float = None
+    cpu_time: float = None
+    relative: float = None
+
+    def _wall_limit(self) -> float:
+        limit = math.inf if self.wall_time is None else self.wall_time
+        if self.relative is not None and _best_wall_time is not None:
+            limit = min(limit, self.relative * _best_wall_time.value)
+        return limit
+
+    def remaining(self, elapsed: float) -> float:
+        """
+        Seconds left until wall time limit.
+        """
+        return max(0.0, self._wall_limit() - elapsed)
+
+    def exceeded(self, pid: int, elapsed: float) -> str:
+        """
+        Returns name of exceeded limit or None.
+        """
+        if self.wall_time is not None and elapsed >= self.wall_time:
+            return 'wall_time'
+        if elapsed >= self._wall_limit():
+            return 'relative'
+        if self.cpu_time is not None and _cpu_time(pid) >= self.cpu_time:
+            return 'cpu_time'
+        return None
+
+    def record(self, wall_time: float) -> None:
+        """
+        Records wall time of successful process.
+        """
+        if _best_wall_time is None:
+            return
+        with _best_wall_time.get_lock():
+            _best_wall_time.value = min(_best_wall_time.value, wall_time)
+
+    @contextlib.contextmanager
+    def prepared(self):
+        """
+        Yields shared best wall time value for pool initializer.
+        """
+        yield multiprocessing.Value('d', math.inf)
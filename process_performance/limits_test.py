@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Limits class
+"""
+
+import sys
+import time
+
+import psutil
+
+from process_performance.limits import Limits, share_best
+from process_performance.monitor import Monitor
+
+
+def test_wall_time_kills():
+    process = psutil.Popen(
+        [sys.executable, '-c', '__import__("time").sleep(30)'])
+    started = time.perf_counter()
+    killed = Monitor().watch(
+        process, lambda pid: None, Limits(wall_time=0.2), started)
+
+    assert killed == 'wall_time'
+    assert process.wait() != 0
+    assert time.perf_counter() - started < 5
+
+
+def test_cpu_time_kills():
+    process = psutil.Popen([sys.executable, '-c', 'while True: pass'])
+    killed = Monitor().watch(process, lambda pid: None, Limits(cpu_time=0.2))
+
+    assert killed == 'cpu_time'
+    assert process.wait() != 0
+
+
+def test_no_limits_exceeded():
+    process = psutil.Popen([sys.executable, '-c', 'pass'])
+
+    assert Monitor().watch(process, lambda pid: None, Limits()) is None
+    assert process.wait() == 0
+
+
+def test_relative():
+    limits = Limits(relative=2)
+    with limits.prepared() as best:
+        share_best(best)
+        try:
+            assert limits.exceeded(0, 100) is None
+            limits.record(1.5)
+            limits.record(3)
+            assert best.value == 1.5
+            assert limits.remaining(1) == 2
+            assert limits.exceeded(0, 2.9) is None
+            assert limits.exceeded(0, 3) == 'relative'
+        finally:
+            share_best(None)
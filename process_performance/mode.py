@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from enum import Enum
+
+
+class ExecutionMode(Enum):
+    """
+    MANAGER keeps contexts in a manager process,
+    every context call from pool workers is a round-trip to it.
+    LOCAL creates and drives context inside pool worker,
+    only data() dictionary is sent back.
+    """
+    MANAGER = 0
+    LOCAL = 1
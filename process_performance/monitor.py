@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Subprocess monitoring strategies.
+    Wait for subprocess to exit while calling status callback.
+"""
+
+import logging
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+from process_performance.limits import Limits
+from process_performance.tree import kill
+from process_performance.usage import exited
+
+# seconds between exit checks of waiter thread without waitid()
+_POLL_INTERVAL = 0.001
+
+
+class MonitorStrategy(Enum):
+    POLL = 0
+    EVENT = 1
+    ADAPTIVE = 2
+
+
+class _ExitWaiter():
+    """
+    Blocks until process exits without reaping it,
+    so exit status and resource usage are still available afterwards.
+
+    Uses pidfd on linux, falls back to a thread blocked
+    in waitid() (posix), polling `usage.exited` where waitid()
+    is missing (macos before python 3.13) or blocked
+    in process.wait() (windows).
+    """
+
+    def __init__(self, process):
+        self._pidfd = None
+        self._poller = None
+        self._exited = threading.Event()
+        self._closed = threading.Event()
+        try:
+            self._pidfd = os.pidfd_open(process.pid)
+            self._poller = select.poll()
+            self._poller.register(self._pidfd, select.POLLIN)
+        except (AttributeError, OSError):
+            self._pidfd = None
+            threading.Thread(
+                target=self._wait_thread,
+                args=(process,),
+                daemon=True).start()
+
+    def _wait_thread(self, process):
+        try:
+            if hasattr(os, 'waitid'):
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+            elif hasattr(os, 'wait4'):
+                # process.wait() would reap it losing its rusage
+                while not exited(process):
+                    if self._closed.wait(_POLL_INTERVAL):
+                        return
+            else:
+                process.wait()
+        except ChildProcessError:
+            pass
+        self._exited.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Waits up to timeout seconds,
+        returns True if process exited.
+        """
+        if self._pidfd is None:
+            return self._exited.wait(timeout)
+        return bool(self._poller.poll(max(0, int(timeout * 1000))))
+
+    def close(self):
+        self._closed.set()
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+
+def _call_status(status: Callable[[int], None], pid: int):
+    try:
+        status(pid)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        logging.getLogger(__name__).warning(
+            'InvokeContextInterface.status exception: %s', exc)
+
+
+def _enforce(process, limits: Limits, started: float) -> str:
+    """
+    Kills process exceeding limits with its process group,
+    returns name of exceeded limit.
+    """
+    if limits is None:
+        return None
+    killed = limits.exceeded(process.pid, time.perf_counter() - started)
+    if killed is not None:
+        kill(process)
+    return killed
+
+
+class _Watch():
+    """
+    State of one watching loop, shared by Monitor and async runner
+    which only differ in how status is called and exit is waited for.
+    """
+
+    def __init__(self, monitor: 'Monitor', process, limits, started):
+        self.monitor = monitor
+        self.process = process
+        self.limits = limits
+        self.started = started
+        self.interval = monitor.interval
+        self.killed = None
+
+    def check(self) -> float:
+        """
+        Kills process exceeding limits,
+        returns seconds to wait for exit before next check.
+        """
+        if self.killed is None:
+            self.killed = _enforce(self.process, self.limits, self.started)
+        timeout = self.interval
+        if self.limits is not None and self.killed is None:
+            timeout = min(timeout, self.limits.remaining(
+                time.perf_counter() - self.started))
+        return timeout
+
+    def waited(self) -> None:
+        """
+        Called when process did not exit within timeout.
+        """
+        if self.monitor.strategy == MonitorStrategy.ADAPTIVE:
+            self.interval = min(self.interval * 2, self.monitor.max_interval)
+
+
+@dataclass
+class Monitor:
+    """
+    Selects how runner waits for subprocess to exit.
+
+    POLL checks process state and calls status every `interval` seconds.
+    EVENT sleeps until process exits, calling status every `interval`.
+    ADAPTIVE is EVENT with interval doubling after every status call
+    until it reaches `max_interval`, so short processes are sampled
+    densely and long ones cost almost no monitoring CPU time.
+    """
+    strategy: MonitorStrategy = MonitorStrategy.ADAPTIVE
+    interval: float = 0.001
+    max_interval: float = 0.1
+
+    def watch(
+            self,
+            process,
+            status: Callable[[int], None],
+            limits: Limits = None,
+            started: float = None) -> str:
+        """
+        Returns once process exits,
+        process is left unreaped where platform allows.
+
+        Process exceeding `limits` is killed, name of exceeded limit
+        is returned then, None otherwise. `started` is perf_counter
+        value when process was started, wall time limit counts from it.
+        """
+        if started is None:
+            started = time.perf_counter()
+        if self.strategy == MonitorStrategy.POLL:
+            return self._watch_poll(process, status, limits, started)
+        return self._watch_event(process, status, limits, started)
+
+    def _watch_poll(self, process, status, limits, started):
+        killed = None
+        while not exited(process):
+            _call_status(status, process.pid)
+            if killed is None:
+                killed = _enforce(process, limits, started)
+            time.sleep(self.interval)
+        return killed
+
+    def _watch_event(self, process, status, limits, started):
+        watch = _Watch(self, process, limits, started)
+        waiter = _ExitWaiter(process)
+        try:
+            while True:
+                _call_status(status, process.pid)
+                if waiter.wait(watch.check()):
+                    break
+                watch.waited()
+        finally:
+            waiter.close()
+        return watch.killed
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Monitor class
+"""
+
+import sys
+import time
+
+import psutil
+import pytest
+
+from process_performance.monitor import Monitor, MonitorStrategy
+
+_SLEEP = 0.5
+
+
+def _spawn_sleeper():
+    return psutil.Popen(
+        [sys.executable, '-c', f'__import__("time").sleep({_SLEEP})'])
+
+
+@pytest.mark.parametrize("strategy", [
+    MonitorStrategy.POLL,
+    MonitorStrategy.EVENT,
+    MonitorStrategy.ADAPTIVE])
+def test_watch_waits_for_exit(strategy):
+    calls = []
+    process = _spawn_sleeper()
+    Monitor(strategy=strategy, interval=0.01).watch(process, calls.append)
+
+    assert process.wait() == 0
+    assert calls[0] == process.pid
+
+
+def test_event_status_interval():
+    calls = []
+    process = _spawn_sleeper()
+    started = time.monotonic()
+    Monitor(strategy=MonitorStrategy.EVENT, interval=0.1).watch(
+        process, calls.append)
+    process.wait()
+
+    assert time.monotonic() - started >= _SLEEP
+    assert 1 <= len(calls) <= _SLEEP / 0.1 + 5
+
+
+def test_adaptive_overhead_below_poll():
+    calls_poll = []
+    process = _spawn_sleeper()
+    Monitor(strategy=MonitorStrategy.POLL).watch(process, calls_poll.append)
+    process.wait()
+
+    calls_adaptive = []
+    process = _spawn_sleeper()
+    cpu_started = time.thread_time()
+    Monitor(strategy=MonitorStrategy.ADAPTIVE, max_interval=0.1).watch(
+        process, calls_adaptive.append)
+    cpu_used = time.thread_time() - cpu_started
+    process.wait()
+
+    assert len(calls_adaptive) < len(calls_poll) / 10
+    assert cpu_used < 0.05
+
+
+def test_status_exception_is_reported(caplog):
+    def status(_pid):
+        raise RuntimeError('status failed')
+
+    process = _spawn_sleeper()
+    Monitor(strategy=MonitorStrategy.EVENT, interval=0.2).watch(
+        process, status)
+    process.wait()
+
+    assert 'status failed' in caplog.text
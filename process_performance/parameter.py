@@ -2,11 +2,8 @@
 # -*- coding: utf-8 -*-
 """
     One parameter for command line.
-    Provides generators to iterate over values.
 """
 
-from process_performance.shape import ParameterSpaceShape
-
 
 def _collapse_generator(values: list):
     """
@@ -22,11 +19,15 @@ def _collapse_generator(values: list):
             break
 
 
-class Parameter():
+class Parameter():  # pylint: disable=too-few-public-methods
     """
-    Keeps single parameter name and values.
+    Keeps single parameter name and values,
+    see ParameterSpace for points generated from them.
 
-    Provides generators to iterate over values.
+    Conditional parameter exists only `when` other parameters
+    listed before it have certain values, given either as dict
+    of { parameter_name : list of values } or as a function
+    receiving dict of preceding parameters and returning bool.
     """
 
     class NoValuesException(RuntimeError):
@@ -35,9 +36,10 @@ class Parameter():
     class NonStringNameException(RuntimeError):
         """NonStringNameException"""
 
-    def __init__(self, name=None, values=None):
+    def __init__(self, name=None, values=None, when=None):
         self.name = name
         self.values = list(values)
+        self.when = when
         if not isinstance(name, str):
             raise Parameter.NonStringNameException(
                 f'Parameter name "{name}" is not string')
@@ -45,33 +47,14 @@ class Parameter():
             raise Parameter.NoValuesException(
                 f'Values vector "{values}" is too short ({len(self.values)})')
 
-    def gen(self, shape: ParameterSpaceShape):
-        return {
-            ParameterSpaceShape.CORNERS: self.gen_corners,
-            ParameterSpaceShape.EDGES: self.gen_edge,
-            ParameterSpaceShape.CUBE: self.gen_cube,
-        }[shape]
-
-    def gen_corners(self):
-        """
-        Generates edge values of the parameter.
-        """
-        if len(self.values) == 1:
-            yield {self.name: self.values[0]}
-        else:
-            yield {self.name: self.values[0]}
-            yield {self.name: self.values[-1]}
-
-    def gen_edge(self):
-        """
-        Generates all parameter values except.
-        """
-        for value in _collapse_generator(self.values[1:-1]):
-            yield {self.name: value}
-
-    def gen_cube(self):
+    def active(self, params: dict) -> bool:
         """
-        Generates all parameter values ordered from edges towards center.
+        Checks if parameter exists given preceding parameters.
         """
-        for value in _collapse_generator(self.values):
-            yield {self.name: value}
+        if self.when is None:
+            return True
+        if callable(self.when):
+            return bool(self.when(params))
+        return all(
+            name in params and params[name] in values
+            for name, values in self.when.items())
@@ -7,6 +7,7 @@
 import pytest
 from process_performance.shape import ParameterSpaceShape
 from process_performance.parameter import _collapse_generator, Parameter
+from process_performance.space import ParameterSpace
 
 
 def test_nonstring_name():
@@ -69,4 +70,4 @@ test_generators_data = [
 @pytest.mark.parametrize("name,values,shapes", test_generators_data)
 def test_generators(shape, name, values, shapes):
     param = Parameter(name=name, values=values)
-    assert list(param.gen(shape)()) == shapes[shape]
+    assert list(ParameterSpace([param], shape)) == shapes[shape]
@@ -5,31 +5,50 @@
     multi-dimensional space of several parameters
 """
 
-import itertools
+from typing import Callable
+
+from process_performance.constraints import resolve
 from process_performance.parameter import Parameter
 from process_performance.shape import ParameterSpaceShape
-
-
-def _tuple_to_dict(dicts: tuple):
-    return {k: v for d in dicts for k, v in d.items()}
+from process_performance.space import ParameterSpace
 
 
 class Parameters():
     """
     Collection of parameters with generator helpers for iterating over
     parameter values space.
+
+    Points violating any of `constraints` are never generated,
+    see `constraints` module. Conditional parameters are left out
+    of points where they are not active.
     """
     class WrongParametersType(RuntimeError):
         """WrongParametersType"""
 
     @classmethod
-    def from_dict(cls, parameter_values_dict: dict[str:list[any]]):
+    def from_dict(
+            cls,
+            parameter_values_dict: dict[str:list[any]],
+            conditions: dict = None,
+            constraints: list[Callable[[dict], bool]] = ()):
+        """
+        `conditions` maps names of conditional parameters
+        to their `Parameter.when`.
+        """
+        conditions = conditions or {}
         param_argv = []
         for name, values in parameter_values_dict.items():
-            param_argv.append(Parameter(name=name, values=values))
-        return Parameters(*param_argv)
+            param_argv.append(Parameter(
+                name=name, values=values, when=conditions.get(name)))
+        return Parameters(*param_argv, constraints=constraints)
 
-    def __init__(self, *parameters):
+    def __init__(
+            self,
+            *parameters,
+            constraints: list[Callable[[dict], bool]] = ()):
+        self._constraints = list(constraints)
+        # shape -> ParameterSpace, keeping pruned positions
+        self._spaces = {}
         self._parameters = []
         for parameter in parameters:
             if isinstance(parameter, Parameter):
@@ -38,45 +57,39 @@ class Parameters():
                 raise Parameters.WrongParametersType(
                     'parameters arguments must be instances of Parameter')
 
-    def gen(self, shape: ParameterSpaceShape):
+    @property
+    def parameters(self) -> list[Parameter]:
+        return list(self._parameters)
+
+    @property
+    def constraints(self) -> list[Callable[[dict], bool]]:
+        return list(self._constraints)
+
+    def space(self, shape: ParameterSpaceShape) -> ParameterSpace:
         """
-        Select generator by its string name.
+        Points of shape as indexable sequence,
+        same space is returned for same shape.
         """
-        return {
-            ParameterSpaceShape.CORNERS: self._gen_corners,
-            ParameterSpaceShape.EDGES: self._gen_edges,
-            ParameterSpaceShape.CUBE: self._gen_cube
-        }[shape]
+        if shape not in self._spaces:
+            self._spaces[shape] = ParameterSpace(
+                self._parameters, shape, self._constraints)
+        return self._spaces[shape]
 
-    def _gen_corners(self):
+    def resolve(self, indexes: tuple[int]) -> dict:
         """
-        Generates corners of multi-dimensional parameter cube.
+        Parameters dict of point given by value indexes
+        or None if it violates a constraint.
         """
-        generators = [p.gen_corners() for p in self._parameters]
-        for value in itertools.product(*generators):
-            yield _tuple_to_dict(value)
+        return resolve(self._parameters, self._constraints, indexes)
 
-    def _gen_edges(self):
+    def count(self, shape: ParameterSpaceShape) -> int:
         """
-            Generates edges of multi-dimensional parameter cube
-            including corners.
-            This generates corners more than once, they supposed
-            to be skipped using value cache.
+        Number of points generated for shape.
         """
-        for p_line in self._parameters:
-            generators = []
-            for p_edge in self._parameters:
-                if p_edge == p_line:
-                    generators.append(p_line.gen_edge())
-                else:
-                    generators.append(p_edge.gen_corners())
-            for value in itertools.product(*generators):
-                yield _tuple_to_dict(value)
+        return len(self.space(shape))
 
-    def _gen_cube(self):
+    def gen(self, shape: ParameterSpaceShape):
         """
-        Generates all possible values of multi-dimensional parameter cube.
+        Select generator by shape.
         """
-        generators = [p.gen_cube() for p in self._parameters]
-        for value in itertools.product(*generators):
-            yield _tuple_to_dict(value)
+        return self.space(shape).__iter__
@@ -7,7 +7,6 @@
 import pytest
 
 from process_performance.parameters import ParameterSpaceShape, Parameters
-from process_performance.parameters import _tuple_to_dict
 
 test_generators_data = [
     (
@@ -167,18 +166,31 @@ def test_generators(shape, params, shapes):
     assert generated_parameter_space == shapes[shape]
 
 
-def test_wrong_parameters():
-    with pytest.raises(Parameters.WrongParametersType):
-        Parameters([])
+@pytest.mark.parametrize("shape", [
+    ParameterSpaceShape.CORNERS,
+    ParameterSpaceShape.EDGES,
+    ParameterSpaceShape.CUBE])
+@pytest.mark.parametrize("params,shapes", test_generators_data)
+def test_count(shape, params, shapes):
+    parameters = Parameters.from_dict(parameter_values_dict=params)
+    assert parameters.count(shape) == len(shapes[shape])
 
 
-tuple_to_dict_data = [
-    [({'a': 1},), {'a': 1}],
-    [({'a': 1}, {'b': 2}), {'a': 1, 'b': 2}],
-    [({'a': 1, 'b': 2}, {'c': 3, 'b': 2}), {'a': 1, 'b': 2, 'c': 3}],
-]
+def test_unique_points():
+    parameters = Parameters.from_dict({
+        name: [1, 2, 2, 3] for name in 'abcde'})
+
+    corners = list(parameters.gen(ParameterSpaceShape.CORNERS)())
+    edges = list(parameters.gen(ParameterSpaceShape.EDGES)())
+    cube = list(parameters.gen(ParameterSpaceShape.CUBE)())
+
+    assert parameters.count(ParameterSpaceShape.EDGES) == len(edges) == 5 * 16
+    assert len(cube) == 3 ** 5
+    points = [tuple(point.values()) for point in corners + edges]
+    assert len(points) == len(set(points))
+    assert set(points) < {tuple(point.values()) for point in cube}
 
 
-@pytest.mark.parametrize('tuple_data,dict_data', tuple_to_dict_data)
-def test_tuple_to_dict(tuple_data, dict_data):
-    assert _tuple_to_dict(tuple_data) == dict_data
+def test_wrong_parameters():
+    with pytest.raises(Parameters.WrongParametersType):
+        Parameters([])
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Multi-objective helpers: online Pareto front tracking
+    and search strategy skipping points which can not improve it.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable
+
+from process_performance.search import SearchStrategy, _idw_predict
+
+
+class Direction(Enum):
+    MINIMIZE = 0
+    MAXIMIZE = 1
+
+
+@dataclass
+class Objective:
+    """
+    One objective, by default read as number from data[name].
+    """
+    name: str
+    direction: Direction = Direction.MINIMIZE
+    value: Callable[[dict], float] = None
+
+    def oriented(self, data: dict) -> float:
+        """
+        Objective value converted for minimization.
+        """
+        if self.value is None:
+            value = float(data[self.name])
+        else:
+            value = float(self.value(data))
+        if self.direction == Direction.MAXIMIZE:
+            return -value
+        return value
+
+
+def _dominates(left: tuple, right: tuple) -> bool:
+    return all(a <= b for a, b in zip(left, right)) and left != right
+
+
+class ParetoFront():
+    """
+    Keeps non-dominated points seen so far.
+    """
+
+    def __init__(self, objectives: list[Objective]):
+        self.objectives = list(objectives)
+        self._front = []
+
+    def vector(self, data: dict) -> tuple:
+        """
+        Returns oriented objective values or None if data lacks them.
+        """
+        try:
+            vector = tuple(o.oriented(data) for o in self.objectives)
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not all(math.isfinite(value) for value in vector):
+            return None
+        return vector
+
+    def dominated(self, vector: tuple) -> bool:
+        """
+        True if vector can not improve the front.
+        """
+        return any(
+            _dominates(point, vector) or point == vector
+            for point, _, _ in self._front)
+
+    def add(self, params: dict, data: dict) -> bool:
+        """
+        Returns True if point joined the front.
+        """
+        vector = self.vector(data)
+        if vector is None or self.dominated(vector):
+            return False
+        self._front = [
+            item for item in self._front if not _dominates(vector, item[0])]
+        self._front.append((vector, params, data))
+        return True
+
+    @property
+    def points(self) -> list[tuple[dict, dict]]:
+        """
+        (params, data) of current front sorted by first objective.
+        """
+        return [(params, data) for _, params, data in sorted(
+            self._front, key=lambda item: item[0])]
+
+    def __len__(self) -> int:
+        return len(self._front)
+
+
+class ParetoSearch(SearchStrategy):
+    """
+    Runs `initial` random points, then proposes points whose optimistic
+    prediction could still join current front. Prediction is inverse
+    distance weighted estimate of every objective, lowered by
+    `exploration` times objective spread times distance to nearest
+    observed point. Stops when no candidate can improve the front.
+
+    Current front is available as `front` during the run.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+            self,
+            objectives: list[Objective],
+            budget: int = None,
+            initial: int = 8,
+            pool: int = 256,
+            exploration: float = 0.5,
+            neighbours: int = 4,
+            **kwargs):
+        super().__init__(budget=budget, **kwargs)
+        self.front = ParetoFront(objectives)
+        self.initial = initial
+        self.pool = pool
+        self.exploration = exploration
+        self.neighbours = neighbours
+        self._observed = []
+
+    def observe(self, params: dict, data: dict) -> None:
+        vector = self.front.vector(data)
+        self.history.append((params, vector))
+        self.front.add(params, data)
+        if vector is not None:
+            self._observed.append(
+                (self._coordinates(self._indexes(params)), vector))
+
+    @property
+    def best(self) -> list[tuple[dict, dict]]:
+        return self.front.points
+
+    def _propose(self) -> tuple:
+        if self.proposed < self.initial or len(self._observed) < 2:
+            return self._random_unseen()
+        spreads = [
+            statistics.pstdev(vector[i] for _, vector in self._observed)
+            for i in range(len(self.front.objectives))]
+        scored = []
+        for candidate in self._random_candidates(self.pool):
+            prediction, distance = _idw_predict(
+                self._coordinates(candidate), self._observed,
+                self.neighbours)
+            optimistic = tuple(
+                value - self.exploration * spread * distance
+                for value, spread in zip(prediction, spreads))
+            if not self.front.dominated(optimistic):
+                scored.append((-distance, candidate))
+        if not scored:
+            return None
+        # least explored promising candidate first
+        return min(scored)[1]
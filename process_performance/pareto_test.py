@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Pareto front tracking
+"""
+
+from process_performance.parameters import Parameters
+from process_performance.pareto import Direction, Objective, \
+    ParetoFront, ParetoSearch
+
+_OBJECTIVES = [
+    Objective('time'),
+    Objective('ratio', direction=Direction.MAXIMIZE),
+]
+
+
+def test_objective_oriented():
+    assert Objective('time').oriented({'time': '1.5'}) == 1.5
+    assert _OBJECTIVES[1].oriented({'ratio': 2}) == -2
+    assert Objective('x', value=lambda d: d['y'] * 2).oriented({'y': 3}) == 6
+
+
+def test_front_add():
+    front = ParetoFront(_OBJECTIVES)
+    assert front.add({'p': 1}, {'time': 2, 'ratio': 2})
+    assert front.add({'p': 2}, {'time': 1, 'ratio': 1})
+    assert not front.add({'p': 3}, {'time': 3, 'ratio': 1})
+    assert not front.add({'p': 4}, {'time': 1, 'ratio': 1})
+    assert not front.add({'p': 5}, {'ratio': 1})
+    assert len(front) == 2
+    assert front.add({'p': 6}, {'time': 1, 'ratio': 3})
+    assert front.points == [({'p': 6}, {'time': 1, 'ratio': 3})]
+
+
+def test_front_order():
+    front = ParetoFront(_OBJECTIVES)
+    front.add({'p': 1}, {'time': 2, 'ratio': 2})
+    front.add({'p': 2}, {'time': 1, 'ratio': 1})
+    assert [params for params, _ in front.points] == [{'p': 2}, {'p': 1}]
+
+
+def test_pareto_search():
+    space = Parameters.from_dict({
+        'x': list(range(10)),
+        'y': list(range(10)),
+    })
+    strategy = ParetoSearch(objectives=_OBJECTIVES, seed=1)
+    strategy.start(space)
+    launches = 0
+    while True:
+        params = strategy.propose()
+        if params is None:
+            break
+        launches += 1
+        strategy.observe(params, {
+            'time': params['x'] + params['y'],
+            'ratio': params['x'],
+        })
+
+    assert launches < 60
+    assert len(strategy.front) == 10
+    assert all(params['y'] == 0 for params, _ in strategy.best)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Placement of pool workers on CPU cores.
+    Every worker and processes it spawns are pinned to own cores,
+    so parallel measurements do not compete for them.
+"""
+
+import contextlib
+import glob
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+
+import psutil
+
+_SYSFS_CPU = '/sys/devices/system/cpu'
+_SYSFS_NODE = '/sys/devices/system/node'
+_CGROUP_PERIOD = 100000
+
+
+@dataclass(frozen=True)
+class Cpu:
+    """
+    Logical CPU, `core` is shared by SMT siblings.
+    """
+    id: int  # pylint: disable=invalid-name
+    core: tuple
+    node: int
+
+
+def _parse_cpulist(cpulist: str) -> list[int]:
+    """
+    Parses kernel cpu list format like "0-3,8,10-11".
+    """
+    cpus = []
+    for chunk in cpulist.strip().split(','):
+        if not chunk:
+            continue
+        first, _, last = chunk.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read_sysfs(path: str) -> str:
+    with open(path, encoding='utf-8') as sysfs_file:
+        return sysfs_file.read().strip()
+
+
+def read_topology() -> list[Cpu]:
+    """
+    CPUs this process is allowed to run on.
+    Core and NUMA node information is read from linux sysfs,
+    elsewhere every CPU is treated as separate core on node 0.
+    """
+    allowed = sorted(psutil.Process().cpu_affinity())
+    nodes = {}
+    for node_path in glob.glob(os.path.join(_SYSFS_NODE, 'node[0-9]*')):
+        node = int(os.path.basename(node_path)[len('node'):])
+        with contextlib.suppress(OSError):
+            for cpu in _parse_cpulist(
+                    _read_sysfs(os.path.join(node_path, 'cpulist'))):
+                nodes[cpu] = node
+    topology = []
+    for cpu in allowed:
+        topology_path = os.path.join(_SYSFS_CPU, f'cpu{cpu}', 'topology')
+        try:
+            core = (
+                int(_read_sysfs(
+                    os.path.join(topology_path, 'physical_package_id'))),
+                int(_read_sysfs(os.path.join(topology_path, 'core_id'))))
+        except (OSError, ValueError):
+            core = (0, cpu)
+        topology.append(Cpu(id=cpu, core=core, node=nodes.get(cpu, 0)))
+    return topology
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Placement:
+    """
+    Pins every pool worker to `cores` dedicated cores.
+
+    With `smt` disabled worker gets one logical CPU of every its core
+    and SMT siblings are left idle, otherwise every logical CPU
+    is treated as a core. With `numa` enabled cores of a worker
+    belong to the same NUMA node. Workers are reniced by `nice`.
+
+    `cgroup` is a writable cgroup v2 directory, every worker is moved
+    into its own child group limited to `cpu_quota` CPUs there.
+    """
+    cores: int = 1
+    smt: bool = False
+    numa: bool = True
+    nice: int = None
+    cgroup: str = None
+    cpu_quota: float = None
+    topology: list[Cpu] = field(default=None, repr=False)
+
+    class NotEnoughCpusException(RuntimeError):
+        """NotEnoughCpusException"""
+
+    class UnsupportedException(RuntimeError):
+        """UnsupportedException"""
+
+    def slots(self, workers: int) -> list[list[int]]:
+        """
+        Returns list of CPU ids for every worker.
+        """
+        topology = self.topology
+        if topology is None:
+            if not hasattr(psutil.Process, 'cpu_affinity'):
+                raise Placement.UnsupportedException(
+                    'CPU affinity is not supported on this platform')
+            topology = read_topology()
+        # node -> core -> cpus
+        cores = {}
+        for cpu in sorted(topology, key=lambda cpu: cpu.id):
+            node = cpu.node if self.numa else 0
+            core = (cpu.core, cpu.id) if self.smt else cpu.core
+            cores.setdefault(node, {}).setdefault(core, []).append(cpu.id)
+        slots = []
+        for node_cores in cores.values():
+            node_cpus = [cpus[0] for cpus in node_cores.values()]
+            while len(node_cpus) >= self.cores and len(slots) < workers:
+                slots.append(node_cpus[:self.cores])
+                node_cpus = node_cpus[self.cores:]
+        if len(slots) < workers:
+            raise Placement.NotEnoughCpusException(
+                f'{workers} workers need {workers * self.cores} cores, '
+                f'only {len(slots) * self.cores} can be placed')
+        return slots
+
+    def apply(self, cpus: list[int]) -> None:
+        """
+        Called in pool worker with its CPU ids.
+        """
+        process = psutil.Process()
+        process.cpu_affinity(cpus)
+        if self.nice is not None:
+            process.nice(self.nice)
+        if self.cgroup is not None:
+            group = os.path.join(self.cgroup, f'worker-{os.getpid()}')
+            os.makedirs(group, exist_ok=True)
+            if self.cpu_quota is not None:
+                with open(os.path.join(group, 'cpu.max'), 'w',
+                          encoding='utf-8') as cpu_max:
+                    cpu_max.write(
+                        f'{int(self.cpu_quota * _CGROUP_PERIOD)} '
+                        f'{_CGROUP_PERIOD}')
+            with open(os.path.join(group, 'cgroup.procs'), 'w',
+                      encoding='utf-8') as procs:
+                procs.write(str(os.getpid()))
+
+    @contextlib.contextmanager
+    def prepared(self, workers: int):
+        """
+        Yields queue of worker slots to be passed to pool initializer,
+        removes worker cgroups afterwards.
+        """
+        slots = multiprocessing.Queue()
+        for slot in self.slots(workers):
+            slots.put(slot)
+        try:
+            yield slots
+        finally:
+            if self.cgroup is not None:
+                for group in glob.glob(os.path.join(self.cgroup, 'worker-*')):
+                    with contextlib.suppress(OSError):
+                        os.rmdir(group)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Placement class
+"""
+
+import pytest
+
+from process_performance.placement import Cpu, Placement, _parse_cpulist, \
+    read_topology
+
+# 2 nodes, 2 cores per node, 2 SMT siblings per core
+_TOPOLOGY = [
+    Cpu(id=cpu, core=(cpu // 4, cpu % 2), node=cpu // 4)
+    for cpu in range(8)
+]
+
+
+@pytest.mark.parametrize("cpulist,cpus", [
+    ('0', [0]),
+    ('0-3', [0, 1, 2, 3]),
+    ('0-1,4,6-7\n', [0, 1, 4, 6, 7]),
+    ('', []),
+])
+def test_parse_cpulist(cpulist, cpus):
+    assert _parse_cpulist(cpulist) == cpus
+
+
+def test_read_topology():
+    topology = read_topology()
+    assert topology
+    assert len({cpu.id for cpu in topology}) == len(topology)
+
+
+def test_slots_physical_cores():
+    placement = Placement(topology=_TOPOLOGY)
+    assert placement.slots(4) == [[0], [1], [4], [5]]
+
+
+def test_slots_smt():
+    placement = Placement(smt=True, topology=_TOPOLOGY)
+    assert placement.slots(8) == [[cpu] for cpu in range(8)]
+
+
+def test_slots_numa():
+    placement = Placement(cores=2, topology=_TOPOLOGY)
+    assert placement.slots(2) == [[0, 1], [4, 5]]
+    with pytest.raises(Placement.NotEnoughCpusException):
+        Placement(cores=3, topology=_TOPOLOGY).slots(1)
+    assert Placement(cores=3, numa=False, topology=_TOPOLOGY).slots(1) == \
+        [[0, 1, 4]]
+
+
+def test_slots_not_enough():
+    with pytest.raises(Placement.NotEnoughCpusException):
+        Placement(topology=_TOPOLOGY).slots(5)
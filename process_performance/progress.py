@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Run progress events and metrics.
+    Reported to a callback and optionally to a JSON-lines log.
+"""
+
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, TextIO
+
+# phases of one launch, measured by runner in seconds
+PHASES = ('setup', 'spawn', 'monitor', 'teardown')
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Progress:
+    """
+    Collects events of a run and metrics derived from them.
+
+    Every event is a dict with `event` name and `time`:
+        scheduled: run of point `index` submitted.
+        finished: run of point `index` ended with `status` completed,
+            failed or deduplicated, `report` has durations of launch
+            phases (setup, spawn, monitor, teardown) and `error`
+            message of failed spawn.
+        cached: point `index` found in cache.
+        done: data of point `index` is returned by runner.
+        progress: snapshot of `metrics()`, emitted at most every
+            `interval` seconds and once more when run ends.
+
+    Events are passed to `callback` and appended to `log` file
+    as JSON lines, values JSON can not represent are converted to str.
+    """
+    callback: Callable[[dict], None] = None
+    log: str = None
+    interval: float = 1.0
+    total: int = field(default=None, init=False)
+    counts: dict = field(default_factory=dict, init=False)
+    _workers: int = field(default=1, init=False, repr=False)
+    _started: float = field(default=None, init=False, repr=False)
+    _snapshot: float = field(default=None, init=False, repr=False)
+    _durations: list = field(default_factory=list, init=False, repr=False)
+    _phases: dict = field(default_factory=dict, init=False, repr=False)
+    _log_file: TextIO = field(default=None, init=False, repr=False)
+
+    def start(self, total: int, workers: int) -> None:
+        """
+        Called by runner before first point with number of points
+        to be run if known in advance and number of parallel workers.
+        """
+        self.total = total
+        self.counts = dict.fromkeys(
+            ('scheduled', 'completed', 'failed', 'deduplicated',
+             'cached', 'done'), 0)
+        self._workers = max(1, workers)
+        self._started = self._snapshot = time.monotonic()
+        self._durations = []
+        self._phases = {phase: 0.0 for phase in PHASES}
+        if self.log is not None:
+            # pylint: disable=consider-using-with
+            self._log_file = open(self.log, 'a', encoding='utf-8')
+
+    def finish(self) -> None:
+        """
+        Called by runner once run ends.
+        """
+        self._emit('progress', **self.metrics())
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def record(self, event: str, **fields) -> None:
+        """
+        Called by runner on every event.
+        """
+        if event == 'finished':
+            self.counts[fields['status']] += 1
+            report = fields.get('report') or {}
+            durations = [report.get(phase) for phase in PHASES]
+            if None not in durations:
+                self._durations.append(sum(durations))
+                for phase, duration in zip(PHASES, durations):
+                    self._phases[phase] += duration
+        else:
+            self.counts[event] += 1
+        self._emit(event, **fields)
+        self.tick()
+
+    def tick(self) -> None:
+        """
+        Emits progress snapshot if `interval` passed since last one.
+        """
+        now = time.monotonic()
+        if now - self._snapshot >= self.interval:
+            self._snapshot = now
+            self._emit('progress', **self.metrics())
+
+    def metrics(self) -> dict:
+        """
+        Counts of points and runs, throughput, mean duration of launch
+        phases and estimated seconds left, None where not known yet.
+        """
+        elapsed = time.monotonic() - self._started
+        launches = len(self._durations)
+        finished = sum(self.counts[status] for status in (
+            'completed', 'failed', 'deduplicated'))
+        metrics = dict(
+            self.counts,
+            total=self.total,
+            running=self.counts['scheduled'] - finished,
+            elapsed=elapsed,
+            launches_per_second=launches / elapsed if elapsed else None,
+            overhead={
+                phase: self._phases[phase] / launches if launches else None
+                for phase in PHASES},
+            runtime_median=(
+                statistics.median(self._durations) if launches else None),
+            eta=None,
+        )
+        if self.total is not None and self.counts['done']:
+            # time spent per returned point, cache hits included,
+            # spread over workers
+            remaining = max(0, self.total - self.counts['done'])
+            metrics['eta'] = (
+                remaining * sum(self._durations)
+                / self.counts['done'] / self._workers)
+        return metrics
+
+    def _emit(self, event: str, **fields) -> None:
+        record = {'event': event, 'time': time.time(), **fields}
+        if self.callback is not None:
+            self.callback(record)
+        if self._log_file is not None:
+            self._log_file.write(json.dumps(record, default=str) + '\n')
+            self._log_file.flush()
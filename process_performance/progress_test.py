@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Progress class
+"""
+
+import json
+
+import pytest
+
+from process_performance.progress import Progress
+
+
+def _report(duration: float) -> dict:
+    return {
+        'setup': duration / 4,
+        'spawn': duration / 4,
+        'monitor': duration / 4,
+        'teardown': duration / 4,
+    }
+
+
+def test_metrics():
+    events = []
+    progress = Progress(callback=events.append, interval=3600)
+    progress.start(total=4, workers=2)
+    for index in range(3):
+        progress.record('scheduled', index=index)
+    progress.record('finished', index=0, status='completed',
+                    report=_report(1.0))
+    progress.record('done', index=0)
+    progress.record('finished', index=1, status='failed',
+                    report={'error': 'OSError()'})
+    progress.record('done', index=1)
+
+    metrics = progress.metrics()
+    assert metrics['total'] == 4
+    assert metrics['scheduled'] == 3
+    assert metrics['completed'] == 1
+    assert metrics['failed'] == 1
+    assert metrics['done'] == 2
+    assert metrics['running'] == 1
+    assert metrics['overhead']['spawn'] == pytest.approx(0.25)
+    assert metrics['runtime_median'] == pytest.approx(1.0)
+    # 1 second of launches per 2 returned points,
+    # 2 points left on 2 workers
+    assert metrics['eta'] == pytest.approx(0.5)
+    assert [e['event'] for e in events] == [
+        'scheduled', 'scheduled', 'scheduled',
+        'finished', 'done', 'finished', 'done']
+
+
+def test_metrics_unknown():
+    progress = Progress()
+    progress.start(total=None, workers=1)
+
+    metrics = progress.metrics()
+    assert metrics['eta'] is None
+    assert metrics['runtime_median'] is None
+    assert metrics['overhead']['setup'] is None
+
+
+def test_log(tmp_path):
+    log = tmp_path / 'progress.jsonl'
+    progress = Progress(log=str(log), interval=0)
+    progress.start(total=1, workers=1)
+    progress.record('cached', index=0, params={'path': tmp_path})
+    progress.finish()
+
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r['event'] for r in records] == ['cached', 'progress', 'progress']
+    assert records[0]['params'] == {'path': str(tmp_path)}
+    assert records[-1]['cached'] == 1
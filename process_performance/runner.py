@@ -1,101 +1,600 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import contextlib
+import inspect
+import logging
 import multiprocessing
 import multiprocessing.managers
+import queue
 import signal
-import subprocess
-import tempfile
-import threading
-import time
-import psutil
 
+from process_performance.cache import ResultCache
+from process_performance.capture import Capture
 from process_performance.context import InvokeContextInterface, InvokeResult
+from process_performance.dedup import DuplicateArgvException, claim
+from process_performance.fixture import Fixture, PreparedFixture
+from process_performance.launch import _Launch
+from process_performance.limits import Limits, share_best
+from process_performance.mode import ExecutionMode
+from process_performance.monitor import Monitor
 from process_performance.parameters import Parameters
+from process_performance.placement import Placement
+from process_performance.progress import Progress
+from process_performance.sinks import Sink
+from process_performance.sampler import Sampler
+from process_performance.search import SearchStrategy, ShapeSearch
 from process_performance.shape import ParameterSpaceShape
+from process_performance.tree import ProcessTree, init_worker
+from process_performance.trials import Trials
+from process_performance.workdir import Workdir
 
 
-def _spawn_process(context: InvokeContextInterface, params: dict):
-    def stream_data_to_buffer(descriptor, buffer):
-        buffer.append(descriptor.read())
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        # lists for mutability
-        stdout = []
-        stderr = []
-
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+# pylint: disable=too-many-locals
+def _spawn_process(
+        context: InvokeContextInterface,
+        params: dict,
+        monitor: Monitor = Monitor(),
+        stdout: Capture = Capture(),
+        stderr: Capture = Capture(),
+        fixture: PreparedFixture = None,
+        workdir: Workdir = Workdir(),
+        limits: Limits = None,
+        argv_claims=None,
+        claim_id: int = None,
+        sampler: Sampler = None,
+        tree: ProcessTree = ProcessTree()):
+    launch = _Launch()
+    with workdir.use() as tmpdir:
+        if fixture is not None:
+            fixture.materialize(tmpdir)
         context.pre(workdir=tmpdir)
+        argv = context.argv(args=params)
+        if argv_claims is not None:
+            claim(argv_claims, argv, tmpdir, claim_id)
 
-        process = psutil.Popen(
-            args=context.argv(args=params),
-            cwd=tmpdir,
-            bufsize=-1,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
+        process = launch.spawn(argv, tmpdir, stdout, stderr, tree, sampler)
+        try:
+            killed = monitor.watch(
+                process, context.status, limits, launch.started)
+        finally:
+            launch.reap()
+        result = launch.result(killed, limits)
 
-        stdout_thread = threading.Thread(
-            target=stream_data_to_buffer,
-            args=(process.stdout, stdout))
-        stderr_thread = threading.Thread(
-            target=stream_data_to_buffer,
-            args=(process.stderr, stderr))
-        stdout_thread.start()
-        stderr_thread.start()
+        context.post()
+    # working directory cleanup is part of teardown
+    result.timings = launch.timings()
+    return result
 
-        while process.is_running():
-            try:
-                context.status(process.pid)
-            except Exception as exc:  # pylint: disable=broad-exception-caught
-                print(f'InvokeContextInterface.status exception: {exc}')
-            # poll() required on linux/darwin, otherwise
-            # is_running() will always return True
-            # and NoSuchProcess is never thrown
-            process.poll()
-            time.sleep(0.001)
-
-        process.wait()
-        stdout_thread.join()
-        stderr_thread.join()
 
-        context.post()
+def _check_spawn_options(spawn, spawn_options: dict) -> None:
+    """
+    Raises TypeError for options `spawn` does not accept,
+    they would otherwise fail every point only once it is run.
+    """
+    accepted = set(inspect.signature(spawn).parameters) - {
+        'context', 'params', 'argv_claims', 'claim_id'}
+    unexpected = sorted(set(spawn_options) - accepted)
+    if unexpected:
+        raise TypeError(f'unexpected options {", ".join(unexpected)}')
 
-        return InvokeResult(
-            exit_code=process.returncode,
-            stdout=stdout[0],
-            stderr=stderr[0],
-        )
+
+def _run_local(
+        context_class: type,
+        params: dict,
+        spawn_options: dict) -> tuple[bool, dict, dict]:
+    """
+    Runs process with context living in pool worker,
+    returns (failed, data, report) tuple, killed process counts as failed.
+    Report has phase timings of the launch or error of failed spawn.
+    """
+    context = context_class()
+    try:
+        result = _spawn_process(context, params, **spawn_options)
+    except DuplicateArgvException:
+        raise
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        context.error(exc)
+        return True, context.data(), {'error': repr(exc)}
+    context.success(result)
+    return result.killed is not None, context.data(), result.timings
 
 
 def _disable_sigint():
     signal.signal(signal.SIGINT, signal.SIG_IGN)
 
 
+def _init_worker(
+        placement: Placement,
+        slots: multiprocessing.Queue,
+        best_wall_time=None):
+    _disable_sigint()
+    init_worker()
+    share_best(best_wall_time)
+    if placement is None:
+        return
+    try:
+        # replacement of a died worker finds no free slot
+        placement.apply(slots.get(timeout=1))
+    except queue.Empty:
+        logging.getLogger(__name__).warning(
+            'Placement: no free slot, worker is not pinned')
+
+
 class CustomManager(multiprocessing.managers.BaseManager):
     pass
 
 
+CustomManager.register('claims', dict, multiprocessing.managers.DictProxy)
+
+
+class _Point():  # pylint: disable=too-few-public-methods
+    """
+    Parameter point being measured, possibly over several runs.
+    """
+
+    def __init__(self, index: int, params: dict, key: str):
+        self.index = index
+        self.params = params
+        self.key = key
+        self.runs = 0
+        self.samples = []
+        # (index, params) of same point proposed again while running
+        self.duplicates = []
+        # points with same argv waiting for this one
+        self.aliases = []
+
+
+class _Task():  # pylint: disable=too-few-public-methods
+    """
+    Single scheduled process, reports itself to `done` queue
+    once its result or error is received.
+    """
+
+    def __init__(self, point: _Point, done: queue.SimpleQueue):
+        self.point = point
+        self.failed = False
+        # phase timings or error, see Progress
+        self.report = None
+        # index of point already running same argv
+        self.alias = None
+        self._done = done
+
+    def _finish(self):
+        self._done.put(self)
+
+
+class _ManagerTask(_Task):
+    """
+    Task with context living in manager process.
+    """
+
+    def __init__(self, context, *args):
+        super().__init__(*args)
+        self.context = context
+
+    def success(self, result: InvokeResult):
+        self.failed = result.killed is not None
+        self.report = result.timings
+        try:
+            self.context.success(result)
+        finally:
+            self._finish()
+
+    def error(self, exception: Exception):
+        if isinstance(exception, DuplicateArgvException):
+            self.alias = exception.owner
+            self._finish()
+            return
+        self.failed = True
+        self.report = {'error': repr(exception)}
+        try:
+            self.context.error(exception)
+        finally:
+            self._finish()
+
+    def collect(self) -> dict:
+        data = self.context.data()
+        # drop proxy so manager can free context right away
+        self.context = None
+        return data
+
+
+class _LocalTask(_Task):
+    """
+    Task with context living in pool worker,
+    receives (failed, data, report) tuple from `_run_local`.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._data = None
+        self._exception = None
+
+    def success(self, payload: tuple[bool, dict, dict]):
+        self.failed, self._data, self.report = payload
+        self._finish()
+
+    def error(self, exception: Exception):
+        if isinstance(exception, DuplicateArgvException):
+            self.alias = exception.owner
+        else:
+            self.failed = True
+            self.report = {'error': repr(exception)}
+            self._exception = exception
+        self._finish()
+
+    def collect(self) -> dict:
+        if self._exception is not None:
+            raise self._exception
+        return self._data
+
+
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+class _Scheduler():
+    """
+    Proposes points, submits their runs to pool
+    and yields (index, data) of completed points.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+            self,
+            processes: int,
+            context_class: type,
+            tasks_per_process: int = 2,
+            cache: ResultCache = None,
+            mode: ExecutionMode = ExecutionMode.MANAGER,
+            search: SearchStrategy = None,
+            trials: Trials = None,
+            progress: Progress = None,
+            sinks: list[Sink] = (),
+            **spawn_options):
+        self.processes = processes
+        self.context_class = context_class
+        self.limit = processes * tasks_per_process
+        self.cache = cache
+        self.mode = mode
+        self.search = search
+        self.trials = trials
+        self.progress = progress
+        self.sinks = list(sinks)
+        self.spawn_options = spawn_options
+        self.argv_claims = None
+        self.pool = None
+        self.manager = None
+        self._done = queue.SimpleQueue()
+        # key -> point being run
+        self._running = {}
+        # index -> point being run and (data, failed) of completed point,
+        # kept for points found running same argv; data of successful
+        # point is found in cache, only its key is kept then
+        self._owners = {}
+        self._owned = {}
+        self._owned_keys = {}
+        self._in_flight = 0
+        self._index = -1
+
+    def _record(self, event: str, **fields):
+        if self.progress is not None:
+            self.progress.record(event, **fields)
+
+    def _start(self):
+        if self.progress is not None:
+            self.progress.start(self.search.total(), self.processes)
+        for sink in self.sinks:
+            sink.open()
+
+    def _stop(self):
+        if self.progress is not None:
+            self.progress.finish()
+        for sink in self.sinks:
+            sink.close()
+
+    def _interval(self) -> float:
+        """
+        Seconds between ticks while waiting, None when nothing ticks.
+        """
+        intervals = [sink.flush_interval for sink in self.sinks]
+        if self.progress is not None:
+            intervals.append(self.progress.interval)
+        return min(intervals, default=None)
+
+    def _tick(self):
+        if self.progress is not None:
+            self.progress.tick()
+        for sink in self.sinks:
+            sink.tick()
+
+    def _output(self, index: int, params: dict, data: dict):
+        self._record('done', index=index)
+        for sink in self.sinks:
+            sink.write(index, params, data)
+
+    def _schedule(self, point: _Point):
+        self._record('scheduled', index=point.index, params=point.params)
+        self._submit(point)
+
+    def _spawn_options(self, point: _Point) -> dict:
+        if self.argv_claims is None:
+            return self.spawn_options
+        self._owners.setdefault(point.index, point)
+        return dict(
+            self.spawn_options,
+            argv_claims=self.argv_claims,
+            claim_id=point.index)
+
+    def _submit(self, point: _Point):
+        if self.mode == ExecutionMode.MANAGER:
+            task = _ManagerTask(
+                self.manager.context_class(), point, self._done)
+            func, args = _spawn_process, (task.context, point.params)
+            kwds = self._spawn_options(point)
+        else:
+            task = _LocalTask(point, self._done)
+            func, args = _run_local, (
+                self.context_class, point.params, self._spawn_options(point))
+            kwds = {}
+        self.pool.apply_async(
+            func=func,
+            args=args,
+            kwds=kwds,
+            callback=task.success,
+            error_callback=task.error,
+        )
+        self._in_flight += 1
+
+    def _propose(self):
+        """
+        Submits proposed points, yields those found in cache.
+        Points are proposed lazily,
+        keeping only a few tasks per process queued.
+        """
+        while self._in_flight < self.limit:
+            params = self.search.propose()
+            if params is None:
+                return
+            self._index += 1
+            key = None
+            if self.cache is not None:
+                key = self.cache.key(params, self.context_class)
+                if key in self._running:
+                    self._running[key].duplicates.append(
+                        (self._index, params))
+                    continue
+                found, data = self.cache.get(key)
+                if found:
+                    self.search.observe(params, data)
+                    self._record('cached', index=self._index)
+                    self._output(self._index, params, data)
+                    yield self._index, data
+                    continue
+            point = _Point(self._index, params, key)
+            if key is not None:
+                self._running[key] = point
+            self._schedule(point)
+
+    def _complete(self, task: _Task):
+        """
+        Returns data of completed point or None if it needs more runs.
+        """
+        data = task.collect()
+        point = task.point
+        if self.trials is None or task.failed:
+            return data
+        point.runs += 1
+        if point.runs > self.trials.warmup:
+            point.samples.append(data)
+        if self.trials.needs_more(point.runs, point.samples):
+            self._schedule(point)
+            return None
+        return self.trials.aggregate(point.samples)
+
+    def _completed(self, task: _Task) -> list[tuple[int, dict]]:
+        """
+        Returns (index, data) of every point completed by task.
+        """
+        self._in_flight -= 1
+        if task.alias is not None:
+            status = 'deduplicated'
+        elif task.failed:
+            status = 'failed'
+        else:
+            status = 'completed'
+        self._record(
+            'finished', index=task.point.index,
+            status=status, report=task.report)
+        if task.alias is not None:
+            self._owners.pop(task.point.index, None)
+            owner = self._owners.get(task.alias)
+            if owner is not None:
+                owner.aliases.append(task.point)
+                return []
+            return self._finish(task.point, *self._owned_data(task.alias))
+        data = self._complete(task)
+        if data is None:
+            return []
+        return self._finish(task.point, data, task.failed)
+
+    def _finish(
+            self,
+            point: _Point,
+            data: dict,
+            failed: bool) -> list[tuple[int, dict]]:
+        completed = [(point.index, point.params)]
+        if point.key is not None:
+            if not failed:
+                self.cache.put(point.key, data)
+            completed += self._running.pop(point.key).duplicates
+        for _, params in completed:
+            self.search.observe(params, data)
+        finished = [(index, data) for index, _ in completed]
+        for index, params in completed:
+            self._output(index, params, data)
+        if self.argv_claims is not None:
+            self._owners.pop(point.index, None)
+            if point.key is not None and not failed:
+                self._owned_keys[point.index] = point.key
+            else:
+                self._owned[point.index] = (data, failed)
+            for alias in point.aliases:
+                finished += self._finish(alias, data, failed)
+        return finished
+
+    def _owned_data(self, index: int) -> tuple[dict, bool]:
+        """
+        Returns (data, failed) of completed point running same argv.
+        """
+        if index in self._owned_keys:
+            return self.cache.get(self._owned_keys[index])[1], False
+        return self._owned[index]
+
+    def _wait(self) -> _Task:
+        """
+        Waits for next completed task,
+        emitting progress snapshots and flushing sinks meanwhile.
+        """
+        interval = self._interval()
+        if interval is None:
+            return self._done.get()
+        while True:
+            try:
+                return self._done.get(timeout=interval)
+            except queue.Empty:
+                self._tick()
+
+    def run(self, pool, manager):
+        self.pool = pool
+        self.manager = manager
+        self._start()
+        try:
+            while True:
+                yield from self._propose()
+                if not self._in_flight:
+                    break
+                yield from self._completed(self._wait())
+        finally:
+            self._stop()
+
+
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+def _run_indexed(
+        processes: int,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape,
+        search: SearchStrategy = None,
+        fixture: Fixture = None,
+        workdir: Workdir = Workdir(),
+        placement: Placement = None,
+        limits: Limits = None,
+        dedup_argv: bool = False,
+        **options):
+    if search is None:
+        search = ShapeSearch(shape=shape)
+    search.start(parameters_space)
+    scheduler = _Scheduler(
+        processes, context_class, search=search, **options)
+    _check_spawn_options(_spawn_process, scheduler.spawn_options)
+    with contextlib.ExitStack() as stack:
+        manager = None
+        if scheduler.mode == ExecutionMode.MANAGER or dedup_argv:
+            CustomManager.register('context_class', context_class)
+            manager = stack.enter_context(CustomManager())
+        if dedup_argv:
+            scheduler.argv_claims = manager.claims()
+        if fixture is not None:
+            scheduler.spawn_options['fixture'] = stack.enter_context(
+                fixture.prepared())
+        scheduler.spawn_options['workdir'] = stack.enter_context(
+            workdir.prepared())
+        slots = None
+        if placement is not None:
+            slots = stack.enter_context(placement.prepared(processes))
+        best_wall_time = None
+        if limits is not None:
+            scheduler.spawn_options['limits'] = limits
+            best_wall_time = stack.enter_context(limits.prepared())
+        pool = stack.enter_context(multiprocessing.Pool(
+            processes=processes,
+            initializer=_init_worker,
+            initargs=(placement, slots, best_wall_time)))
+        yield from scheduler.run(pool, manager)
+
+
+def run_iter(
+        processes: int,
+        context_class: type,
+        parameters_space: Parameters,
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Yields data of every context as soon as its process finishes,
+    in order of completion. Context is released right after
+    its data is collected.
+
+    `parameters_space` may also be ParameterSpace,
+    like a shard of one, `shape` is ignored then.
+
+    Unknown options raise TypeError before any process is run.
+
+    Options:
+        monitor: Monitor selecting how processes are waited for.
+        tasks_per_process: parameter space is generated lazily, at most
+            `processes * tasks_per_process` tasks are scheduled at once.
+        cache: ResultCache, points found there are not run again,
+            data of successful runs is stored there. Repeated points
+            within one run are run once.
+        mode: ExecutionMode, LOCAL keeps contexts in pool workers
+            and avoids manager round-trips on every context call,
+            `context_class` must be importable by workers then.
+        search: SearchStrategy proposing points based on results
+            seen so far, replaces enumeration of `shape`.
+        trials: Trials, runs every point several times
+            and aggregates its data.
+        stdout, stderr: Capture policy of process output streams,
+            whole output is kept in memory by default.
+        fixture: Fixture, input files built once and placed
+            into every working directory before `pre` is called.
+        workdir: Workdir, temporary directory per process by default,
+            or persistent per pool worker, reset between processes.
+        placement: Placement pinning every pool worker and processes
+            it spawns to dedicated cores.
+        limits: Limits, processes running too long are killed,
+            their InvokeResult.killed is set, their data
+            is not cached and they are not repeated by trials.
+        dedup_argv: points whose contexts return same argv,
+            apart from working directory path, are run once
+            and data of that run is returned for all of them.
+            Contexts of duplicates are dropped after `argv`.
+        sampler: Sampler recording resource usage time series
+            of every process into InvokeResult.samples.
+        tree: ProcessTree, by default every process gets its own
+            process group, killed with all descendants once
+            the process exits, exceeds limits or the run is aborted.
+        progress: Progress receiving events of the run, periodic
+            snapshots of its metrics and phase timings of every launch.
+        sinks: list of Sink, like CsvSink, data of every point
+            is written to each of them as soon as it is returned.
+    """
+    for _, data in _run_indexed(
+            processes, context_class, parameters_space, shape, **options):
+        yield data
+
+
 def run(
         processes: int,
         context_class: type,
         parameters_space: Parameters,
-        shape: ParameterSpaceShape):
-    CustomManager.register('context_class', context_class)
-    with CustomManager() as manager:
-        contexts = []
-        with multiprocessing.Pool(
-                processes=processes,
-                initializer=_disable_sigint) as pool:
-            tasks = []
-            for params in parameters_space.gen(shape=shape)():
-                context = manager.context_class()
-                tasks.append(pool.apply_async(
-                    func=_spawn_process,
-                    args=(context, params),
-                    callback=context.success,
-                    error_callback=context.error,
-                ))
-                contexts.append(context)
-            for task in tasks:
-                task.wait()
-        return [context.data() for context in contexts]
+        shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+        **options):
+    """
+    Returns data of every context in order of parameter space generation.
+    Accepts same options as `run_iter`.
+    """
+    data = {}
+    for index, context_data in _run_indexed(
+            processes, context_class, parameters_space, shape, **options):
+        data[index] = context_data
+    return [data[index] for index in sorted(data)]
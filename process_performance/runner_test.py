@@ -1,13 +1,27 @@
 #!/usr/bin/env python
 
+import json
 import os
 import sys
 from collections import namedtuple
 
+import pytest
 from psutil import Process, NoSuchProcess
+from process_performance.cache import ResultCache
+from process_performance.capture import Capture, CaptureMode
+from process_performance.fixture import Fixture
+from process_performance.limits import Limits
+from process_performance.mode import ExecutionMode
+from process_performance.search import CoordinateDescent, ShapeSearch
+from process_performance.trials import Trials
+from process_performance.workdir import Workdir, WorkdirMode
 from process_performance.parameters import Parameters
+from process_performance.placement import Placement
+from process_performance.progress import PHASES, Progress
+from process_performance.sampler import Sampler
+from process_performance.sinks import JsonlSink
 from process_performance.runner import \
-    InvokeContextInterface, _spawn_process, run
+    InvokeContextInterface, _spawn_process, run, run_iter
 from process_performance.shape import ParameterSpaceShape
 
 
@@ -118,14 +132,40 @@ class InvokeContextCallCount(InvokeContextInterface):
         }
 
 
-def test_run_call_count():
+def test_spawn_usage():
+    context = InvokeContextStdout()
+    result = _spawn_process(context, {})
+
+    assert result.exit_code == 0
+    assert result.time_wall > 0
+    assert result.time_user is not None
+    assert result.time_system is not None
+
+
+def test_spawn_capture(tmp_path):
+    context = InvokeContextStdout()
+    result = _spawn_process(
+        context, {},
+        stdout=Capture(mode=CaptureMode.FILE, directory=str(tmp_path)),
+        stderr=Capture(mode=CaptureMode.DISCARD))
+
+    assert result.stdout == b''
+    assert result.stderr == b''
+    assert result.stderr_path is None
+    with open(result.stdout_path, 'rb') as stdout_file:
+        assert stdout_file.read().strip() == b'Hello World'
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_call_count(mode):
     param_space = Parameters.from_dict({})
 
     data = run(
         processes=1,
         context_class=InvokeContextCallCount,
         parameters_space=param_space,
-        shape=ParameterSpaceShape.CUBE
+        shape=ParameterSpaceShape.CUBE,
+        mode=mode,
     )
 
     assert data[0]['calls_error'] == 0
@@ -171,14 +211,16 @@ class InvokeContextStdout(InvokeContextInterface):
         }
 
 
-def test_run_stdout():
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_stdout(mode):
     param_space = Parameters.from_dict({})
 
     data = run(
         processes=1,
         context_class=InvokeContextStdout,
         parameters_space=param_space,
-        shape=ParameterSpaceShape.CUBE
+        shape=ParameterSpaceShape.CUBE,
+        mode=mode,
     )
 
     assert data[0]['stdout'] == 'Hello World'
@@ -211,14 +253,596 @@ class InvokeContextError(InvokeContextInterface):
         }
 
 
-def test_run_exception():
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_exception(mode):
     param_space = Parameters.from_dict({})
 
     data = run(
         processes=1,
         context_class=InvokeContextError,
         parameters_space=param_space,
-        shape=ParameterSpaceShape.CUBE
+        shape=ParameterSpaceShape.CUBE,
+        mode=mode,
     )
 
     assert data[0]['exception'] != ''
+
+
+class InvokeContextSleep(InvokeContextInterface):
+    delay: float = 0
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        pass
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        self.delay = args['delay']
+        return [sys.executable, '-c',
+                f'__import__("time").sleep({self.delay})']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'delay': self.delay,
+        }
+
+
+def test_run_iter_completion_order():
+    param_space = Parameters.from_dict({'delay': [1.0, 0.0]})
+
+    data = run_iter(
+        processes=2,
+        context_class=InvokeContextSleep,
+        parameters_space=param_space,
+        shape=ParameterSpaceShape.CUBE
+    )
+
+    assert next(data) == {'delay': 0.0}
+    assert next(data) == {'delay': 1.0}
+    assert not list(data)
+
+
+def test_run_generation_order():
+    param_space = Parameters.from_dict({'delay': [0.5, 0.0]})
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextSleep,
+        parameters_space=param_space,
+        shape=ParameterSpaceShape.CUBE
+    )
+
+    assert data == [{'delay': 0.5}, {'delay': 0.0}]
+
+
+class _CountingSpace():  # pylint: disable=too-few-public-methods
+    def __init__(self, points: int):
+        self.points = points
+        self.generated = 0
+
+    def gen(self, shape):
+        assert shape == ParameterSpaceShape.CUBE
+        return self._gen
+
+    def _gen(self):
+        for _ in range(self.points):
+            self.generated += 1
+            yield {'delay': 0}
+
+
+def test_run_iter_lazy_generation():
+    param_space = _CountingSpace(points=10)
+
+    data = run_iter(
+        processes=1,
+        context_class=InvokeContextSleep,
+        parameters_space=param_space,
+        shape=ParameterSpaceShape.CUBE,
+        tasks_per_process=2,
+    )
+
+    next(data)
+    assert param_space.generated <= 3
+    assert len(list(data)) == 9
+    assert param_space.generated == 10
+
+
+class InvokeContextLaunchLog(InvokeContextInterface):
+    point: int = 0
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        pass
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        self.point = args['point']
+        return [sys.executable, '-c',
+                f'open({args["log"]!r}, "a").write("x")']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'point': self.point,
+        }
+
+
+class RepeatingSearch(ShapeSearch):
+    """
+    Proposes every point twice in a row.
+    """
+
+    def __init__(self):
+        super().__init__(shape=ParameterSpaceShape.CUBE)
+        self._repeat = None
+
+    def propose(self) -> dict:
+        if self._repeat is not None:
+            params, self._repeat = self._repeat, None
+            return params
+        self._repeat = super().propose()
+        return self._repeat
+
+
+def test_run_cache(tmp_path):
+    log = os.path.join(tmp_path, 'launches.log')
+    param_space = Parameters.from_dict({
+        'log': [log],
+        'point': [1, 2],
+    })
+
+    with ResultCache(os.path.join(tmp_path, 'cache.sqlite')) as cache:
+        for _ in range(2):
+            # repeated point is proposed while first one is running
+            data = run(
+                processes=2,
+                context_class=InvokeContextLaunchLog,
+                parameters_space=param_space,
+                search=RepeatingSearch(),
+                cache=cache,
+            )
+            assert data == [{'point': 1}] * 2 + [{'point': 2}] * 2
+
+    with open(log, encoding='utf-8') as log_file:
+        assert log_file.read() == 'xx'
+
+
+def test_run_unexpected_option():
+    with pytest.raises(TypeError, match='monitr'):
+        run(
+            processes=2,
+            context_class=InvokeContextLaunchLog,
+            parameters_space=Parameters.from_dict({'point': [1]}),
+            monitr=None,
+        )
+
+
+def test_run_sinks(tmp_path):
+    log = os.path.join(tmp_path, 'launches.log')
+    output = tmp_path / 'data.jsonl'
+    param_space = Parameters.from_dict({
+        'log': [log],
+        'point': [1, 2],
+    })
+
+    with ResultCache(os.path.join(tmp_path, 'cache.sqlite')) as cache:
+        run(
+            processes=2,
+            context_class=InvokeContextLaunchLog,
+            parameters_space=param_space,
+            cache=cache,
+            sinks=[JsonlSink(str(output))],
+        )
+        # interrupted run left only first record
+        output.write_text(output.read_text().splitlines(True)[0])
+        data = run(
+            processes=2,
+            context_class=InvokeContextLaunchLog,
+            parameters_space=param_space,
+            cache=cache,
+            sinks=[JsonlSink(str(output), resume=True)],
+        )
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(
+        ({'index': record['index'], 'point': record['point']}
+         for record in records),
+        key=lambda record: record['index']) == [
+            {'index': 0, 'point': 1}, {'index': 1, 'point': 2}]
+    assert len({record['key'] for record in records}) == 2
+    assert data == [{'point': 1}, {'point': 2}]
+    with open(log, encoding='utf-8') as log_file:
+        assert log_file.read() == 'xx'
+
+
+class InvokeContextArgv(InvokeContextInterface):
+    workdir: str = None
+    point: str = None
+
+    def pre(self, workdir) -> None:
+        self.workdir = workdir
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        pass
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        self.point = args['flag']
+        flags = [flag for flag in [args['flag']] if flag != '']
+        return [sys.executable, '-c',
+                f'open({args["log"]!r}, "a").write("x")',
+                os.path.join(self.workdir, 'input')] + flags
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'point': self.point,
+        }
+
+
+@pytest.mark.parametrize('cached', [False, True])
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_dedup_argv(tmp_path, mode, cached):
+    log = os.path.join(tmp_path, 'launches.log')
+    param_space = Parameters.from_dict({
+        'log': [log],
+        'flag': ['', '-a', '', '-b'],
+        'repeat': [1, 2],
+    })
+
+    with ResultCache(os.path.join(tmp_path, 'cache.sqlite')) as cache:
+        data = run(
+            processes=2,
+            context_class=InvokeContextArgv,
+            parameters_space=param_space,
+            dedup_argv=True,
+            mode=mode,
+            cache=cache if cached else None,
+        )
+
+    assert len(data) == 6
+    assert sorted(d['point'] for d in data) == ['', '', '-a', '-a', '-b', '-b']
+    with open(log, encoding='utf-8') as log_file:
+        assert log_file.read() == 'xxx'
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_progress(tmp_path, mode):
+    param_space = Parameters.from_dict({'delay': [0.0, 0.1, 0.1]})
+    events = []
+    log = tmp_path / 'progress.jsonl'
+
+    run(
+        processes=2,
+        context_class=InvokeContextSleep,
+        parameters_space=param_space,
+        mode=mode,
+        progress=Progress(callback=events.append, log=str(log)),
+    )
+
+    finished = [e for e in events if e['event'] == 'finished']
+    assert len(finished) == 2
+    assert all(set(e['report']) == set(PHASES) for e in finished)
+    assert sorted(e['index'] for e in events if e['event'] == 'done') \
+        == [0, 1]
+    metrics = events[-1]
+    assert metrics['event'] == 'progress'
+    assert metrics['total'] == 2
+    assert metrics['completed'] == 2
+    assert metrics['running'] == 0
+    assert metrics['eta'] == 0
+    assert metrics['overhead']['monitor'] > 0
+    assert len(log.read_text().splitlines()) == len(events)
+
+
+def test_run_search():
+    param_space = Parameters.from_dict({'delay': [0.0, 0.1, 0.2, 0.3]})
+    search = CoordinateDescent(
+        objective=lambda data: data['delay'], start={'delay': 0.3})
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextSleep,
+        parameters_space=param_space,
+        search=search,
+        mode=ExecutionMode.LOCAL,
+    )
+
+    assert sorted(d['delay'] for d in data) == [0.0, 0.1, 0.2, 0.3]
+    assert search.best == ({'delay': 0.0}, 0.0)
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_trials(tmp_path, mode):
+    log = os.path.join(tmp_path, 'launches.log')
+    param_space = Parameters.from_dict({
+        'log': [log],
+        'point': [1, 2],
+    })
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextLaunchLog,
+        parameters_space=param_space,
+        trials=Trials(repeat=3, warmup=1, metrics=['point']),
+        mode=mode,
+    )
+
+    assert [d['point'] for d in data] == [1, 2]
+    assert [d['trials'] for d in data] == [3, 3]
+    assert data[1]['point_stdev'] == 0
+    with open(log, encoding='utf-8') as log_file:
+        assert log_file.read() == 'x' * 8
+
+
+class InvokeContextFixture(InvokeContextInterface):
+    content: str = ''
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.content = result.stdout.decode()
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c', 'print(open("input").read(), end="")']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'content': self.content,
+        }
+
+
+def _build_fixture(directory):
+    with open(os.path.join(directory, 'input'), 'w',
+              encoding='utf-8') as input_file:
+        input_file.write('fixture')
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_fixture(mode):
+    param_space = Parameters.from_dict({'point': [1, 2]})
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextFixture,
+        parameters_space=param_space,
+        fixture=Fixture(build=_build_fixture),
+        mode=mode,
+    )
+
+    assert data == [{'content': 'fixture'}, {'content': 'fixture'}]
+
+
+class InvokeContextWorkdir(InvokeContextInterface):
+    workdir: str = ''
+    content: list = None
+
+    def pre(self, workdir) -> None:
+        self.workdir = workdir
+        self.content = os.listdir(workdir)
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        pass
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c', 'open("leftover", "w").close()']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'workdir': self.workdir,
+            'content': self.content,
+        }
+
+
+def test_run_workdir_reuse(tmp_path):
+    param_space = Parameters.from_dict({'point': list(range(6))})
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextWorkdir,
+        parameters_space=param_space,
+        workdir=Workdir(mode=WorkdirMode.REUSE, root=str(tmp_path)),
+        mode=ExecutionMode.LOCAL,
+    )
+
+    assert all(d['content'] == [] for d in data)
+    assert len({d['workdir'] for d in data}) <= 2
+    assert not os.listdir(tmp_path)
+
+
+class InvokeContextAffinity(InvokeContextInterface):
+    affinity: list = None
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.affinity = [
+            int(cpu) for cpu in result.stdout.decode().split()]
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c',
+                'print(*__import__("psutil").Process().cpu_affinity())']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'affinity': self.affinity,
+        }
+
+
+@pytest.mark.skipif(not hasattr(Process, 'cpu_affinity'),
+                    reason='cpu affinity is not supported')
+def test_run_placement():
+    param_space = Parameters.from_dict({'point': [1, 2]})
+    slot = Placement().slots(1)[0]
+
+    data = run(
+        processes=1,
+        context_class=InvokeContextAffinity,
+        parameters_space=param_space,
+        placement=Placement(),
+        mode=ExecutionMode.LOCAL,
+    )
+
+    assert data == [{'affinity': slot}, {'affinity': slot}]
+
+
+class InvokeContextKilled(InvokeContextInterface):
+    killed: str = None
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.killed = result.killed
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c',
+                f'__import__("time").sleep({args["delay"]})']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'killed': self.killed,
+        }
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_limits_relative(mode):
+    param_space = Parameters.from_dict({'delay': [0.0, 30.0]})
+
+    data = run(
+        processes=1,
+        context_class=InvokeContextKilled,
+        parameters_space=param_space,
+        limits=Limits(wall_time=20, relative=5),
+        mode=mode,
+    )
+
+    assert data == [{'killed': None}, {'killed': 'relative'}]
+
+
+def test_run_limits_not_cached(tmp_path):
+    param_space = Parameters.from_dict({'delay': [30.0]})
+
+    with ResultCache(os.path.join(tmp_path, 'cache.sqlite')) as cache:
+        data = run(
+            processes=1,
+            context_class=InvokeContextKilled,
+            parameters_space=param_space,
+            limits=Limits(wall_time=0.5),
+            cache=cache,
+        )
+
+        assert data == [{'killed': 'wall_time'}]
+        assert not cache
+
+
+class InvokeContextSamples(InvokeContextInterface):
+    samples: int = 0
+    peak_rss: int = 0
+
+    def pre(self, workdir) -> None:
+        pass
+
+    def post(self) -> None:
+        pass
+
+    def success(self, result) -> None:
+        self.samples = len(result.samples)
+        self.peak_rss = result.samples.peak('rss')
+
+    def error(self, exception) -> None:
+        pass
+
+    def argv(self, args) -> list:
+        return [sys.executable, '-c',
+                f'data = bytearray({args["size"]}); '
+                '__import__("time").sleep(0.3)']
+
+    def status(self, pid: int) -> None:
+        pass
+
+    def data(self) -> dict:
+        return {
+            'samples': self.samples,
+            'peak_rss': self.peak_rss,
+        }
+
+
+@pytest.mark.parametrize('mode', list(ExecutionMode))
+def test_run_sampler(mode):
+    param_space = Parameters.from_dict({'size': [0, 128 << 20]})
+
+    data = run(
+        processes=2,
+        context_class=InvokeContextSamples,
+        parameters_space=param_space,
+        sampler=Sampler(interval=0.02),
+        mode=mode,
+    )
+
+    assert all(d['samples'] > 5 for d in data)
+    assert data[1]['peak_rss'] - data[0]['peak_rss'] > 100 << 20
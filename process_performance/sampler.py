@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Resource usage time series of running subprocess.
+    Sampled by a thread of the process running it, kept in typed arrays.
+"""
+
+import array
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from functools import partial
+
+import psutil
+
+
+def _usage(process: psutil.Process) -> tuple:
+    """
+    Returns (cpu time, rss, threads, read bytes, write bytes)
+    of running process, None once it exited.
+    """
+    try:
+        with process.oneshot():
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return None
+            times = process.cpu_times()
+            usage = (
+                times.user + times.system,
+                process.memory_info().rss,
+                process.num_threads())
+            if not hasattr(process, 'io_counters'):
+                return usage + (0, 0)
+            io_counters = process.io_counters()
+            return usage + (io_counters.read_bytes, io_counters.write_bytes)
+    except (psutil.Error, OSError):
+        return None
+
+
+@dataclass
+class Samples:
+    """
+    Time series of one process, one array per metric, one item
+    per sample. Metrics are summed over the process tree when sampled
+    with `Sampler.tree`.
+
+    time: seconds since process start.
+    cpu_percent: CPU time used since previous sample per wall time,
+        100 is one fully used core.
+    rss: resident set size in bytes.
+    threads: number of threads.
+    processes: number of processes.
+    read_bytes, write_bytes: I/O counters in bytes, where available.
+    """
+    time: array.array = field(default_factory=partial(array.array, 'd'))
+    cpu_percent: array.array = field(
+        default_factory=partial(array.array, 'd'))
+    rss: array.array = field(default_factory=partial(array.array, 'Q'))
+    threads: array.array = field(default_factory=partial(array.array, 'I'))
+    processes: array.array = field(
+        default_factory=partial(array.array, 'I'))
+    read_bytes: array.array = field(
+        default_factory=partial(array.array, 'Q'))
+    write_bytes: array.array = field(
+        default_factory=partial(array.array, 'Q'))
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def peak(self, name: str):
+        """
+        Largest sampled value of metric, None without samples.
+        """
+        return max(getattr(self, name), default=None)
+
+    def to_numpy(self) -> dict:
+        """
+        NumPy arrays of every metric, sharing memory with samples.
+        """
+        import numpy  # pylint: disable=import-outside-toplevel
+        return {
+            column.name: numpy.frombuffer(
+                getattr(self, column.name),
+                dtype=getattr(self, column.name).typecode)
+            for column in fields(self)}
+
+
+@dataclass
+class Sampler:
+    """
+    Selects how running subprocess is sampled, set as `sampler`
+    option of runner. Samples are taken every `interval` seconds
+    by a thread independent of monitoring strategy and are set
+    as InvokeResult.samples.
+
+    With `tree` all descendants of the process are sampled, too.
+    """
+    interval: float = 0.01
+    tree: bool = True
+
+    def start(self, pid: int, started: float) -> '_Recording':
+        return _Recording(self, pid, started)
+
+
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+class _Recording():
+    """
+    Sampling thread of one process.
+    """
+
+    def __init__(self, sampler: Sampler, pid: int, started: float):
+        self.sampler = sampler
+        self.samples = Samples()
+        self._started = started
+        self._stop = threading.Event()
+        self._processes = {}
+        try:
+            self._root = psutil.Process(pid)
+        except psutil.Error:
+            self._root = None
+        # cpu time of previous sample, taken at start
+        self._previous = (started, 0.0)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _tree(self) -> list:
+        """
+        Sampled processes, keeping psutil objects of known pids
+        so process identity is checked against creation time.
+        """
+        tree = [self._root]
+        if self.sampler.tree:
+            try:
+                tree += self._root.children(recursive=True)
+            except psutil.Error:
+                pass
+        self._processes = {
+            process.pid: self._processes.get(process.pid, process)
+            for process in tree}
+        return list(self._processes.values())
+
+    def _sample(self) -> bool:
+        """
+        Appends one sample, returns False once process is gone.
+        """
+        now = time.perf_counter()
+        usages = [usage for usage in map(_usage, self._tree())
+                  if usage is not None]
+        if not usages:
+            return False
+        cpu, rss, threads, read, write = map(sum, zip(*usages))
+        previous_time, previous_cpu = self._previous
+        self._previous = (now, cpu)
+        samples = self.samples
+        samples.time.append(now - self._started)
+        # cpu time of exited descendants is lost, never report negative
+        samples.cpu_percent.append(max(
+            0.0, (cpu - previous_cpu) / max(now - previous_time, 1e-9) * 100))
+        samples.rss.append(rss)
+        samples.threads.append(threads)
+        samples.processes.append(len(usages))
+        samples.read_bytes.append(read)
+        samples.write_bytes.append(write)
+        return True
+
+    def _run(self):
+        if self._root is None:
+            return
+        while self._sample():
+            if self._stop.wait(self.sampler.interval):
+                return
+
+    def stop(self) -> Samples:
+        """
+        Stops sampling, call once process exited.
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.samples
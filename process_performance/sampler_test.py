@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Sampler class
+"""
+
+import pickle
+import statistics
+import sys
+import time
+
+import psutil
+import pytest
+
+from process_performance.sampler import Sampler, Samples
+
+_TREE = '''
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+data = bytearray(64 << 20)
+time.sleep(1)
+child.kill()
+'''
+
+
+def _record(sampler: Sampler, code: str) -> Samples:
+    started = time.perf_counter()
+    process = psutil.Popen([sys.executable, '-c', code])
+    recording = sampler.start(process.pid, started)
+    process.wait()
+    return recording.stop()
+
+
+def test_sample_tree():
+    samples = _record(Sampler(interval=0.02), _TREE)
+
+    assert len(samples) > 10
+    assert samples.peak('processes') == 2
+    assert samples.peak('rss') > 64 << 20
+    assert statistics.median(samples.cpu_percent) > 50
+    assert list(samples.time) == sorted(samples.time)
+    assert all(len(getattr(samples, name)) == len(samples) for name in (
+        'cpu_percent', 'rss', 'threads', 'processes',
+        'read_bytes', 'write_bytes'))
+
+
+def test_sample_root_only():
+    samples = _record(Sampler(interval=0.02, tree=False), _TREE)
+
+    assert samples.peak('processes') == 1
+    # busy child is not counted, idle parent is
+    assert statistics.median(samples.cpu_percent) < 50
+
+
+def test_samples_compact():
+    samples = Samples()
+    for i in range(1000):
+        samples.time.append(i)
+        samples.rss.append(i << 20)
+
+    assert samples.peak('rss') == 999 << 20
+    assert Samples().peak('rss') is None
+    assert len(pickle.dumps(samples)) < 20000
+    assert pickle.loads(pickle.dumps(samples)) == samples
+
+
+def test_samples_to_numpy():
+    numpy = pytest.importorskip('numpy')
+    samples = Samples()
+    samples.rss.append(1 << 40)
+
+    arrays = samples.to_numpy()
+    assert arrays['rss'].dtype == numpy.uint64
+    assert arrays['rss'][0] == 1 << 40
+    assert len(arrays['time']) == 0
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Search strategies proposing parameter points to run.
+    Adaptive strategies choose next points based on results seen so far.
+"""
+
+import math
+import random
+import statistics
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from process_performance.parameters import Parameters
+from process_performance.shape import ParameterSpaceShape
+from process_performance.space import ParameterSpace
+
+
+# pylint: disable=too-many-instance-attributes
+class SearchStrategy(ABC):
+    """
+    Proposes parameter points to runner and observes their data.
+
+    Points are handled as tuples of value indexes into `Parameter.values`,
+    `objective` maps context data to a number to be minimized.
+    Data the objective fails on is treated as infinitely bad.
+    """
+
+    def __init__(
+            self,
+            objective: Callable[[dict], float] = None,
+            budget: int = None,
+            seed: int = None):
+        self.objective = objective
+        self.budget = budget
+        self.proposed = 0
+        self.history = []
+        self._random = random.Random(seed)
+        self._parameters = []
+        self._resolve = None
+        self._seen = set()
+
+    def start(self, parameters_space: Parameters) -> None:
+        """
+        Called by runner before first proposal.
+        """
+        self._parameters = parameters_space.parameters
+        self._resolve = parameters_space.resolve
+        self._start()
+
+    def _start(self) -> None:
+        pass
+
+    def propose(self) -> dict:
+        """
+        Returns next point to run or None if there is nothing
+        to run until more results are observed.
+        Runner stops once None is returned with no runs in progress.
+        """
+        if self.budget is not None and self.proposed >= self.budget:
+            return None
+        while True:
+            indexes = self._propose()
+            if indexes is None:
+                return None
+            self._seen.add(indexes)
+            params = self._resolve(indexes)
+            if params is not None and self._indexes(params) == indexes:
+                break
+            # invalid points and aliases of points with conditional
+            # parameters which are not active are never run
+            self._observe(indexes, math.inf)
+        self.proposed += 1
+        return params
+
+    def total(self) -> int:
+        """
+        Number of points to be proposed if known in advance,
+        None otherwise.
+        """
+        return self.budget
+
+    def observe(self, params: dict, data: dict) -> None:
+        """
+        Called by runner with data of every proposed point.
+        """
+        value = self._value(data)
+        self.history.append((params, value))
+        self._observe(self._indexes(params), value)
+
+    def _value(self, data: dict) -> float:
+        if self.objective is None:
+            return math.inf
+        try:
+            return float(self.objective(data))
+        except Exception:  # pylint: disable=broad-exception-caught
+            return math.inf
+
+    @property
+    def best(self) -> tuple[dict, float]:
+        """
+        Returns (params, value) of best point observed so far.
+        """
+        if not self.history:
+            return None
+        return min(self.history, key=lambda item: item[1])
+
+    @abstractmethod
+    def _propose(self) -> tuple:
+        """
+        Returns tuple of value indexes or None.
+        """
+
+    def _observe(self, indexes: tuple, value: float) -> None:
+        pass
+
+    def _point(self, indexes: tuple) -> dict:
+        return self._resolve(indexes)
+
+    def _indexes(self, params: dict) -> tuple:
+        """
+        Value indexes of point, first value
+        of parameters which are not active.
+        """
+        return tuple(
+            parameter.values.index(params[parameter.name])
+            if parameter.name in params else 0
+            for parameter in self._parameters)
+
+    def _size(self) -> int:
+        return math.prod(len(p.values) for p in self._parameters)
+
+    def _random_point(self) -> tuple:
+        return tuple(
+            self._random.randrange(len(p.values)) for p in self._parameters)
+
+    def _random_unseen(self) -> tuple:
+        if len(self._seen) >= self._size():
+            return None
+        while True:
+            indexes = self._random_point()
+            if indexes not in self._seen:
+                return indexes
+
+    def _random_candidates(self, count: int) -> list[tuple]:
+        """
+        Up to `count` distinct unseen points in stable order.
+        """
+        candidates = set()
+        for _ in range(count):
+            candidate = self._random_unseen()
+            if candidate is None:
+                break
+            candidates.add(candidate)
+        return sorted(candidates)
+
+    def _coordinates(self, indexes: tuple) -> tuple:
+        """
+        Point position scaled to unit cube.
+        """
+        return tuple(
+            index / (len(p.values) - 1) if len(p.values) > 1 else 0.0
+            for p, index in zip(self._parameters, indexes))
+
+
+def _idw_predict(
+        coordinates: tuple,
+        observed: list[tuple[tuple, tuple]],
+        neighbours: int) -> tuple[tuple, float]:
+    """
+    Inverse distance weighted prediction of value vector at `coordinates`
+    from `neighbours` nearest of observed (coordinates, values) pairs.
+    Returns predicted values and distance to nearest observed point.
+    """
+    nearest = sorted(
+        (math.dist(coordinates, point), values)
+        for point, values in observed)[:neighbours]
+    weights = [1 / (distance ** 2 + 1e-12) for distance, _ in nearest]
+    prediction = tuple(
+        sum(weight * values[i]
+            for weight, (_, values) in zip(weights, nearest)) / sum(weights)
+        for i in range(len(nearest[0][1])))
+    return prediction, nearest[0][0]
+
+
+class ShapeSearch(SearchStrategy):
+    """
+    Static enumeration of parameter space shape,
+    this is what runner does when no strategy is given.
+    ParameterSpace, like a shard of one, is enumerated as it is.
+    """
+
+    def __init__(self, shape: ParameterSpaceShape, **kwargs):
+        super().__init__(**kwargs)
+        self.shape = shape
+        self._space = None
+        self._points = iter(())
+
+    def start(self, parameters_space: Parameters) -> None:
+        if isinstance(parameters_space, Parameters):
+            parameters_space = parameters_space.space(self.shape)
+        if isinstance(parameters_space, ParameterSpace):
+            self._space = parameters_space
+            self._points = iter(parameters_space)
+        else:
+            self._points = parameters_space.gen(shape=self.shape)()
+
+    def total(self) -> int:
+        # counting space with constraints evaluates all of its points
+        count = None if self._space is None else len(self._space)
+        totals = [t for t in (count, self.budget) if t is not None]
+        return min(totals, default=None)
+
+    def propose(self) -> dict:
+        if self.budget is not None and self.proposed >= self.budget:
+            return None
+        params = next(self._points, None)
+        if params is not None:
+            self.proposed += 1
+        return params
+
+    def observe(self, params: dict, data: dict) -> None:
+        if self.objective is not None:
+            self.history.append((params, self._value(data)))
+
+    def _propose(self) -> tuple:
+        return None
+
+
+class RandomSearch(SearchStrategy):
+    """
+    Uniform random sampling without repetitions.
+    """
+
+    def _propose(self) -> tuple:
+        return self._random_unseen()
+
+
+class LatinHypercube(SearchStrategy):
+    """
+    Latin hypercube sampling of `samples` points: every parameter
+    value range is split into `samples` strata, each stratum
+    is sampled once. Points mapping to the same values are run once.
+    """
+
+    def __init__(self, samples: int, **kwargs):
+        super().__init__(**kwargs)
+        self.samples = samples
+        self._queue = []
+
+    def _start(self) -> None:
+        columns = []
+        for parameter in self._parameters:
+            strata = list(range(self.samples))
+            self._random.shuffle(strata)
+            columns.append([
+                int((stratum + self._random.random()) / self.samples
+                    * len(parameter.values))
+                for stratum in strata])
+        self._queue = list(dict.fromkeys(zip(*columns)))
+
+    def _propose(self) -> tuple:
+        if self._queue:
+            return self._queue.pop(0)
+        return None
+
+
+# pylint: disable=too-many-instance-attributes
+class CoordinateDescent(SearchStrategy):
+    """
+    Tries all values of one parameter keeping others fixed,
+    moves to the best point found, then goes to next parameter.
+    Stops after full pass over parameters without improvement.
+    """
+
+    def __init__(self, start: dict = None, **kwargs):
+        super().__init__(**kwargs)
+        self.start_point = start
+        self._current = None
+        self._dimension = -1
+        self._improved = False
+        self._line = []
+        self._queue = []
+        self._values = {}
+        self._finished = False
+
+    def _start(self) -> None:
+        if self.start_point is not None:
+            self._current = self._indexes(self.start_point)
+        else:
+            self._current = tuple(
+                (len(p.values) - 1) // 2 for p in self._parameters)
+        self._line = [self._current]
+        self._queue = [self._current]
+
+    def _propose(self) -> tuple:
+        while not self._finished:
+            if self._queue:
+                return self._queue.pop(0)
+            if any(point not in self._values for point in self._line):
+                # waiting for results of current line
+                return None
+            self._next_line()
+        return None
+
+    def _observe(self, indexes: tuple, value: float) -> None:
+        self._values[indexes] = value
+
+    def _next_line(self) -> None:
+        best = min(self._line, key=lambda point: self._values[point])
+        if self._values[best] < self._values[self._current]:
+            self._current = best
+            self._improved = True
+        self._dimension += 1
+        if self._dimension == len(self._parameters):
+            if not self._improved:
+                self._finished = True
+                return
+            self._dimension = 0
+            self._improved = False
+        self._line = [
+            self._current[:self._dimension] + (index,) +
+            self._current[self._dimension + 1:]
+            for index in range(len(self._parameters[self._dimension].values))
+        ]
+        self._queue = [
+            point for point in self._line
+            if point not in self._values and point not in self._seen]
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Runs `candidates` random points once, keeps best 1/`eta` of them
+    and runs those again, ranking by mean objective over all runs,
+    until single point is left. Spends repeated runs of noisy
+    measurements only on promising points.
+
+    Points are run repeatedly, so it should not be used with cache.
+    """
+
+    def __init__(self, candidates: int, eta: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.candidates = candidates
+        self.eta = eta
+        self._survivors = []
+        self._queue = []
+        self._outstanding = 0
+        self._values = {}
+
+    def _start(self) -> None:
+        count = min(self.candidates, self._size())
+        while len(self._survivors) < count:
+            self._survivors.append(self._random_unseen())
+            self._seen.add(self._survivors[-1])
+        self._queue = list(self._survivors)
+
+    def _propose(self) -> tuple:
+        if not self._queue and not self._outstanding \
+                and len(self._survivors) > 1:
+            self._survivors.sort(
+                key=lambda point: statistics.fmean(self._values[point]))
+            self._survivors = self._survivors[
+                :math.ceil(len(self._survivors) / self.eta)]
+            if len(self._survivors) > 1:
+                self._queue = list(self._survivors)
+        if self._queue:
+            self._outstanding += 1
+            return self._queue.pop(0)
+        return None
+
+    def _observe(self, indexes: tuple, value: float) -> None:
+        self._outstanding -= 1
+        self._values.setdefault(indexes, []).append(value)
+
+    @property
+    def best(self) -> tuple[dict, float]:
+        if not self._values:
+            return None
+        point = min(
+            self._values,
+            key=lambda point: statistics.fmean(self._values[point]))
+        return self._point(point), statistics.fmean(self._values[point])
+
+
+class SurrogateSearch(SearchStrategy):
+    """
+    Runs `initial` random points, then proposes points minimizing
+    prediction of inverse distance weighted surrogate model
+    lowered by `exploration` times distance to nearest observed point.
+    Prediction is evaluated on `pool` random unseen candidates.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+            self,
+            budget: int,
+            initial: int = 5,
+            pool: int = 256,
+            exploration: float = 1.0,
+            neighbours: int = 5,
+            **kwargs):
+        super().__init__(budget=budget, **kwargs)
+        self.initial = initial
+        self.pool = pool
+        self.exploration = exploration
+        self.neighbours = neighbours
+        self._observed = []
+
+    def _observe(self, indexes: tuple, value: float) -> None:
+        if math.isfinite(value):
+            self._observed.append((self._coordinates(indexes), (value,)))
+
+    def _propose(self) -> tuple:
+        if self.proposed < self.initial or len(self._observed) < 2:
+            return self._random_unseen()
+        candidates = self._random_candidates(self.pool)
+        if not candidates:
+            return None
+        spread = statistics.pstdev(value for _, (value,) in self._observed)
+        return min(
+            candidates,
+            key=lambda candidate: self._score(candidate, spread))
+
+    def _score(self, indexes: tuple, spread: float) -> float:
+        (prediction,), distance = _idw_predict(
+            self._coordinates(indexes), self._observed, self.neighbours)
+        return prediction - self.exploration * spread * distance
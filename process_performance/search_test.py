@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for search strategies
+"""
+
+import math
+
+import pytest
+
+from process_performance.parameters import Parameters
+from process_performance.search import CoordinateDescent, LatinHypercube, \
+    RandomSearch, ShapeSearch, SuccessiveHalving, SurrogateSearch
+from process_performance.shape import ParameterSpaceShape
+
+_SPACE = {
+    'x': list(range(10)),
+    'y': list(range(10)),
+}
+
+
+def _objective(data):
+    return (data['x'] - 3) ** 2 + (data['y'] - 7) ** 2
+
+
+def _drive(strategy, space=None, concurrency=2):
+    """
+    Runs strategy like runner does, data is point itself.
+    """
+    strategy.start(Parameters.from_dict(space or _SPACE))
+    proposed = []
+    pending = []
+    while True:
+        while len(pending) < concurrency:
+            params = strategy.propose()
+            if params is None:
+                break
+            proposed.append(params)
+            pending.append(params)
+        if not pending:
+            break
+        params = pending.pop(0)
+        strategy.observe(params, params)
+    return proposed
+
+
+def test_shape_search():
+    proposed = _drive(ShapeSearch(shape=ParameterSpaceShape.CORNERS))
+    assert proposed == [
+        {'x': 0, 'y': 0}, {'x': 0, 'y': 9},
+        {'x': 9, 'y': 0}, {'x': 9, 'y': 9}]
+
+
+def test_shape_search_total():
+    strategy = ShapeSearch(shape=ParameterSpaceShape.CUBE, budget=50)
+    strategy.start(Parameters.from_dict(_SPACE))
+    assert strategy.total() == 50
+
+    strategy = ShapeSearch(shape=ParameterSpaceShape.EDGES)
+    strategy.start(Parameters.from_dict(_SPACE))
+    assert strategy.total() == 2 * 8 * 2
+    assert len(_drive(ShapeSearch(shape=ParameterSpaceShape.EDGES))) == 32
+
+
+def test_random_search_constraints():
+    parameters = Parameters.from_dict(
+        _SPACE,
+        conditions={'y': {'x': [0]}},
+        constraints=[lambda params: params['x'] != 5])
+    strategy = RandomSearch(seed=1)
+    strategy.start(parameters)
+    proposed = []
+    while (params := strategy.propose()) is not None:
+        proposed.append(params)
+
+    assert len(proposed) == 8 + 10
+    assert {'x': 5} not in proposed
+    assert {'x': 0, 'y': 9} in proposed
+    assert {'x': 1} in proposed
+
+
+def test_random_search_unique():
+    proposed = _drive(RandomSearch(objective=_objective, seed=1))
+    assert len(proposed) == 100
+    assert len({(p['x'], p['y']) for p in proposed}) == 100
+
+
+def test_random_search_budget():
+    strategy = RandomSearch(objective=_objective, budget=10, seed=1)
+    assert len(_drive(strategy)) == 10
+    assert strategy.best[1] == min(_objective(p) for p, _ in strategy.history)
+
+
+def test_latin_hypercube_strata():
+    proposed = _drive(LatinHypercube(samples=10, seed=1))
+    assert sorted(p['x'] for p in proposed) == list(range(10))
+    assert sorted(p['y'] for p in proposed) == list(range(10))
+
+
+def test_coordinate_descent():
+    strategy = CoordinateDescent(objective=_objective)
+    proposed = _drive(strategy)
+    assert strategy.best == ({'x': 3, 'y': 7}, 0)
+    assert len(proposed) < 40
+
+
+def test_coordinate_descent_start():
+    strategy = CoordinateDescent(objective=_objective, start={'x': 9, 'y': 0})
+    proposed = _drive(strategy, concurrency=1)
+    assert proposed[0] == {'x': 9, 'y': 0}
+    assert strategy.best == ({'x': 3, 'y': 7}, 0)
+
+
+def test_successive_halving():
+    strategy = SuccessiveHalving(
+        objective=_objective, candidates=8, eta=2, seed=1)
+    proposed = _drive(strategy)
+    assert len(proposed) == 8 + 4 + 2
+    best_params, _ = strategy.best
+    assert _objective(best_params) == min(_objective(p) for p in proposed)
+
+
+def test_surrogate_search():
+    strategy = SurrogateSearch(objective=_objective, budget=25, seed=1)
+    proposed = _drive(strategy)
+    assert len(proposed) == 25
+    assert len({(p['x'], p['y']) for p in proposed}) == 25
+    assert strategy.best[1] <= 2
+
+
+@pytest.mark.parametrize("strategy", [
+    RandomSearch(budget=5),
+    CoordinateDescent(),
+    SurrogateSearch(budget=5),
+])
+def test_failed_objective(strategy):
+    strategy.objective = lambda data: data['missing']
+    _drive(strategy)
+    assert all(math.isinf(value) for _, value in strategy.history)
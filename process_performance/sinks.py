@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Result sinks writing data of every point to disk as runner
+    returns it, so memory stays bounded and a crash loses nothing.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+
+
+def _key(params: dict) -> str:
+    canonical = json.dumps(params, sort_keys=True, default=repr)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _truncate_partial(path: str) -> None:
+    """
+    Drops last line of text file if it is not terminated,
+    it is a record cut by a crash.
+    """
+    with open(path, 'rb+') as file:
+        size = file.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            step = min(position, 64 * 1024)
+            file.seek(position - step)
+            chunk = file.read(step)
+            newline = chunk.rfind(b'\n')
+            if newline >= 0:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != size:
+            file.truncate(position)
+
+
+class Sink(ABC):
+    """
+    Receives data of every point from runner, set as `sinks` option.
+
+    Every record is data dict with point `index` and `key`, a hash
+    of point parameters, added as first fields. Records are buffered
+    and flushed every `flush_interval` seconds and once the run ends.
+
+    With `resume`, records already in file at `path`, like one left
+    by interrupted run, are kept and records of points with same
+    parameters are not written again, whatever search proposed them.
+    Every record of this run is written, also of points returned
+    more than once.
+    Index of a point may differ between runs. Points are not run again
+    when they are found in ResultCache, pass one to the runner
+    to resume a sweep. Without `resume` existing file is replaced.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            resume: bool = False,
+            flush_interval: float = 1.0):
+        self.path = path
+        self.resume = resume
+        self.flush_interval = flush_interval
+        self._written = set()
+        self._flushed = None
+
+    def open(self) -> None:
+        """
+        Called by runner before first point.
+        """
+        existing = self.resume and self._exists()
+        self._written = set(self._read_keys()) if existing else set()
+        self._open(existing)
+        self._flushed = time.monotonic()
+
+    def write(self, index: int, params: dict, data: dict) -> None:
+        """
+        Called by runner with data of every returned point.
+        """
+        key = _key(params)
+        # keys of resumed file only, repeated points of this run,
+        # like ones successive halving revisits, are all written
+        if key in self._written:
+            return
+        self._write({'index': index, 'key': key, **data})
+        self.tick()
+
+    def tick(self) -> None:
+        """
+        Flushes buffered records if `flush_interval` passed.
+        """
+        now = time.monotonic()
+        if now - self._flushed >= self.flush_interval:
+            self._flushed = now
+            self._flush()
+
+    def close(self) -> None:
+        """
+        Called by runner once run ends.
+        """
+        self._flush()
+        self._close()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _exists(self) -> bool:
+        """
+        Checks if there are records to resume.
+        """
+        return os.path.exists(self.path)
+
+    @abstractmethod
+    def _read_keys(self) -> list[str]:
+        """
+        Keys of records in existing file.
+        """
+
+    @abstractmethod
+    def _open(self, existing: bool) -> None:
+        pass
+
+    @abstractmethod
+    def _write(self, record: dict) -> None:
+        pass
+
+    @abstractmethod
+    def _flush(self) -> None:
+        pass
+
+    @abstractmethod
+    def _close(self) -> None:
+        pass
+
+
+class JsonlSink(Sink):
+    """
+    Appends one JSON object per line,
+    values JSON can not represent are converted to str.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        self._file = None
+
+    def _read_keys(self) -> list[str]:
+        _truncate_partial(self.path)
+        with open(self.path, encoding='utf-8') as file:
+            return [json.loads(line)['key'] for line in file if line.strip()]
+
+    def _open(self, existing: bool) -> None:
+        # pylint: disable=consider-using-with
+        self._file = open(
+            self.path, 'a' if existing else 'w', encoding='utf-8')
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, default=str) + '\n')
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class CsvSink(Sink):
+    """
+    Writes CSV with stable schema: columns are index, key and `fields`,
+    by default keys of first record, or header of resumed file.
+    Keys missing in a record are left empty, keys not in schema
+    are dropped.
+    """
+
+    def __init__(self, path: str, fields: list[str] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.fields = fields
+        self._header = False
+        self._file = None
+        self._writer = None
+
+    def _read_keys(self) -> list[str]:
+        _truncate_partial(self.path)
+        with open(self.path, newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            keys = [row['key'] for row in reader]
+            if reader.fieldnames is not None:
+                self.fields = reader.fieldnames
+                self._header = True
+        return keys
+
+    def _open(self, existing: bool) -> None:
+        # pylint: disable=consider-using-with
+        self._file = open(
+            self.path, 'a' if existing else 'w', newline='', encoding='utf-8')
+        self._writer = None
+        if existing and self._header:
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self.fields, extrasaction='ignore')
+
+    def _write(self, record: dict) -> None:
+        if self._writer is None:
+            if self.fields is None:
+                self.fields = list(record)
+            else:
+                self.fields = ['index', 'key'] + [
+                    name for name in self.fields
+                    if name not in ('index', 'key')]
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self.fields, extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow(record)
+
+    def _flush(self) -> None:
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(Sink):
+    """
+    Writes Parquet file with pyarrow. Every `batch_size` records are
+    written to a fragment file, so at most one batch is held in memory.
+    Column types are inferred per batch and unified once the run ends:
+    null columns take type of later values, integers are promoted
+    to floats, columns missing in a batch are null, columns with
+    values of other differing types are converted to str. Pass `schema`,
+    a pyarrow.Schema, to fix columns and types instead, keys not in it
+    are dropped then; keep `key` column in it to resume.
+
+    Parquet file is complete only once closed, fragments are kept
+    in `path` + '.partial' directory until then; pair with JsonlSink
+    to keep records of a crashed run. Resumed file and fragments
+    left by a crashed run are kept as first fragments.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            batch_size: int = 1024,
+            schema=None,
+            **kwargs):
+        super().__init__(path, **kwargs)
+        self.batch_size = batch_size
+        self.schema = schema
+        self._fragments = []
+        self._count = 0
+        self._rows = []
+
+    def _exists(self) -> bool:
+        return super()._exists() or bool(self._partial_numbers())
+
+    def _read_keys(self) -> list[str]:
+        from pyarrow import parquet  # pylint: disable=import-outside-toplevel
+        numbers = self._partial_numbers()
+        fragments = [self.path] if super()._exists() else []
+        fragments += [self._fragment_path(number) for number in numbers]
+        self._fragments = []
+        self._count = numbers[-1] + 1 if numbers else 0
+        keys = set()
+        for fragment in fragments:
+            fragment_keys = parquet.read_table(
+                fragment, columns=['key']).column('key').to_pylist()
+            # fragment merged by close interrupted before cleanup
+            if fragment_keys and fragment_keys[0] in keys:
+                continue
+            self._fragments.append(fragment)
+            keys.update(fragment_keys)
+        return list(keys)
+
+    def _partial_path(self, name: str = '') -> str:
+        return os.path.join(f'{self.path}.partial', name)
+
+    def _fragment_path(self, number: int) -> str:
+        return self._partial_path(f'{number}.parquet')
+
+    def _partial_numbers(self) -> list[int]:
+        """
+        Sorted numbers of fragments in partial directory.
+        """
+        try:
+            names = os.listdir(self._partial_path())
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(name.removesuffix('.parquet')) for name in names
+            if name.endswith('.parquet')
+            and name.removesuffix('.parquet').isdigit())
+
+    def _open(self, existing: bool) -> None:
+        if not existing:
+            shutil.rmtree(self._partial_path(), ignore_errors=True)
+            self._fragments = []
+            self._count = 0
+        os.makedirs(self._partial_path(), exist_ok=True)
+        self._rows = []
+
+    def _write(self, record: dict) -> None:
+        self._rows.append(record)
+        if len(self._rows) >= self.batch_size:
+            self._write_batch()
+
+    def _flush(self) -> None:
+        # file is not readable before close, small fragments would
+        # only slow closing it
+        pass
+
+    def _write_batch(self) -> None:
+        if not self._rows:
+            return
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        from pyarrow import parquet
+        if self.schema is not None:
+            table = pyarrow.Table.from_pylist(self._rows, schema=self.schema)
+        else:
+            names = dict.fromkeys(name for row in self._rows for name in row)
+            table = pyarrow.Table.from_pydict({
+                name: _array([row.get(name) for row in self._rows])
+                for name in names})
+        fragment = self._fragment_path(self._count)
+        # fragment cut by a crash must not be found on resume
+        parquet.write_table(table, f'{fragment}.tmp')
+        os.replace(f'{fragment}.tmp', fragment)
+        self._fragments.append(fragment)
+        self._count += 1
+        self._rows = []
+
+    def _close(self) -> None:
+        from pyarrow import parquet  # pylint: disable=import-outside-toplevel
+        self._write_batch()
+        if not self._fragments:
+            shutil.rmtree(self._partial_path())
+            return
+        schema = self.schema or _unify(
+            [parquet.read_schema(fragment) for fragment in self._fragments])
+        merged = self._partial_path('merged.parquet')
+        with parquet.ParquetWriter(merged, schema) as writer:
+            for fragment in self._fragments:
+                batches = parquet.ParquetFile(fragment).iter_batches(
+                    batch_size=self.batch_size)
+                for batch in batches:
+                    writer.write_table(_conform(batch, schema))
+        os.replace(merged, self.path)
+        shutil.rmtree(self._partial_path())
+
+
+def _array(values: list):
+    """
+    Array of values, converted to str if they have no common type.
+    """
+    import pyarrow  # pylint: disable=import-outside-toplevel
+    try:
+        return pyarrow.array(values)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return _strings(values)
+
+
+def _strings(values: list):
+    import pyarrow  # pylint: disable=import-outside-toplevel
+    return pyarrow.array(
+        [None if value is None else str(value) for value in values],
+        pyarrow.string())
+
+
+def _unify(schemas: list):
+    """
+    Schema with fields of all schemas, in order of appearance.
+    Fields of types which can not be promoted to a common one are str.
+    """
+    import pyarrow  # pylint: disable=import-outside-toplevel
+    fields = {}
+    for schema in schemas:
+        for field in schema:
+            fields.setdefault(field.name, []).append(field)
+    unified = []
+    for name, same in fields.items():
+        try:
+            unified.append(pyarrow.unify_schemas(
+                [pyarrow.schema([field]) for field in same],
+                promote_options='permissive').field(name))
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            unified.append(pyarrow.field(name, pyarrow.string()))
+    return pyarrow.schema(unified)
+
+
+def _cast(column, data_type):
+    import pyarrow  # pylint: disable=import-outside-toplevel
+    if data_type == pyarrow.string() and column.type != data_type:
+        # same str as in batches with mixed types
+        return _strings(column.to_pylist())
+    return column.cast(data_type)
+
+
+def _conform(batch, schema):
+    """
+    Table of record batch with columns and types of schema.
+    """
+    import pyarrow  # pylint: disable=import-outside-toplevel
+    return pyarrow.Table.from_arrays([
+        _cast(batch.column(field.name), field.type)
+        if field.name in batch.schema.names
+        else pyarrow.nulls(len(batch), field.type)
+        for field in schema], schema=schema)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for result sinks
+"""
+
+import csv
+import json
+
+import pytest
+
+from process_performance.sinks import CsvSink, JsonlSink, ParquetSink, _key
+
+
+def _jsonl(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def _csv(path) -> list[dict]:
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def _params(point: int) -> dict:
+    return {'point': point}
+
+
+def test_jsonl(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    with JsonlSink(str(path)) as sink:
+        sink.write(1, _params(1), {'size': 10, 'path': tmp_path})
+        sink.write(0, _params(0), {'size': 20})
+        sink.write(2, _params(1), {'size': 30})
+
+    assert _jsonl(path) == [
+        {'index': 1, 'key': _key(_params(1)),
+         'size': 10, 'path': str(tmp_path)},
+        {'index': 0, 'key': _key(_params(0)), 'size': 20},
+        {'index': 2, 'key': _key(_params(1)), 'size': 30},
+    ]
+
+
+def test_jsonl_flush_interval(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    sink = JsonlSink(str(path), flush_interval=0)
+    sink.open()
+    sink.write(0, _params(0), {'size': 10})
+    assert _jsonl(path) == [{'index': 0, 'key': _key(_params(0)), 'size': 10}]
+    sink.close()
+
+
+def test_jsonl_resume(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    with JsonlSink(str(path)) as sink:
+        sink.write(0, _params(0), {'size': 10})
+    # last record cut by crash
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"index": 1, "ke')
+
+    # indexes differ between runs, like with random search
+    with JsonlSink(str(path), resume=True) as sink:
+        sink.write(0, _params(1), {'size': 20})
+        sink.write(1, _params(0), {'size': 10})
+        sink.write(2, _params(1), {'size': 30})
+
+    assert _jsonl(path) == [
+        {'index': 0, 'key': _key(_params(0)), 'size': 10},
+        {'index': 0, 'key': _key(_params(1)), 'size': 20},
+        {'index': 2, 'key': _key(_params(1)), 'size': 30},
+    ]
+
+
+def test_jsonl_replace(tmp_path):
+    path = tmp_path / 'data.jsonl'
+    path.write_text('{"index": 0, "key": "", "size": 10}\n')
+
+    with JsonlSink(str(path)) as sink:
+        sink.write(0, _params(0), {'size': 20})
+
+    assert _jsonl(path) == [{'index': 0, 'key': _key(_params(0)), 'size': 20}]
+
+
+def test_csv_schema(tmp_path):
+    path = tmp_path / 'data.csv'
+    with CsvSink(str(path)) as sink:
+        sink.write(0, _params(0), {'size': 10, 'exit': 0})
+        sink.write(1, _params(1), {'exit': 1, 'extra': 'dropped'})
+
+    assert _csv(path) == [
+        {'index': '0', 'key': _key(_params(0)), 'size': '10', 'exit': '0'},
+        {'index': '1', 'key': _key(_params(1)), 'size': '', 'exit': '1'},
+    ]
+
+
+def test_csv_fields(tmp_path):
+    path = tmp_path / 'data.csv'
+    with CsvSink(str(path), fields=['exit']) as sink:
+        sink.write(0, _params(0), {'size': 10, 'exit': 0})
+
+    assert _csv(path) == [
+        {'index': '0', 'key': _key(_params(0)), 'exit': '0'}]
+
+
+def test_csv_resume(tmp_path):
+    path = tmp_path / 'data.csv'
+    with CsvSink(str(path), fields=['exit', 'size']) as sink:
+        sink.write(0, _params(0), {'size': 10, 'exit': 0})
+    # last record cut by crash
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('1,abc,0,2')
+
+    with CsvSink(str(path), resume=True) as sink:
+        sink.write(0, _params(0), {'size': 10, 'exit': 0})
+        sink.write(1, _params(1), {'size': 20, 'exit': 0})
+
+    assert _csv(path) == [
+        {'index': '0', 'key': _key(_params(0)), 'exit': '0', 'size': '10'},
+        {'index': '1', 'key': _key(_params(1)), 'exit': '0', 'size': '20'},
+    ]
+
+
+def test_csv_resume_missing(tmp_path):
+    path = tmp_path / 'data.csv'
+
+    with CsvSink(str(path), resume=True) as sink:
+        sink.write(0, _params(0), {'exit': 0})
+
+    assert _csv(path) == [
+        {'index': '0', 'key': _key(_params(0)), 'exit': '0'}]
+
+
+def _parquet_records(path) -> list[dict]:
+    parquet = pytest.importorskip('pyarrow.parquet')
+    return [
+        {name: value for name, value in record.items() if name != 'key'}
+        for record in parquet.read_table(str(path)).to_pylist()]
+
+
+def test_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'data.parquet'
+    with ParquetSink(str(path), batch_size=2) as sink:
+        for index in range(5):
+            sink.write(index, _params(index), {'size': index * 10})
+        assert not path.exists()
+
+    assert _parquet_records(path) == [
+        {'index': index, 'size': index * 10} for index in range(5)]
+
+    with ParquetSink(str(path), resume=True, batch_size=2) as sink:
+        sink.write(4, _params(4), {'size': 0})
+        sink.write(5, _params(5), {'size': 50})
+
+    assert _parquet_records(path) == [
+        {'index': index, 'size': index * 10} for index in range(6)]
+
+
+def test_parquet_resume_partial(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'data.parquet'
+    with ParquetSink(str(path), batch_size=2) as sink:
+        sink.write(0, _params(0), {'size': 0})
+
+    # crashed run, fragments are left behind
+    sink = ParquetSink(str(path), resume=True, batch_size=2)
+    sink.open()
+    for index in range(1, 6):
+        sink.write(index, _params(index), {'size': index * 10})
+    assert len(list((tmp_path / 'data.parquet.partial').iterdir())) == 2
+
+    with ParquetSink(str(path), resume=True, batch_size=2) as sink:
+        for index in range(7):
+            sink.write(index, _params(index), {'size': index * 10})
+
+    assert _parquet_records(path) == [
+        {'index': index, 'size': index * 10} for index in range(7)]
+    assert not (tmp_path / 'data.parquet.partial').exists()
+
+
+def test_parquet_promotes_types(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'data.parquet'
+    with ParquetSink(str(path), batch_size=2) as sink:
+        sink.write(0, _params(0), {'killed': None, 'time': 1})
+        sink.write(1, _params(1), {'killed': None, 'time': 2})
+        sink.write(2, _params(2), {'killed': 'wall_time', 'time': 2.5})
+        sink.write(3, _params(3), {'extra': 'x'})
+
+    assert _parquet_records(path) == [
+        {'index': 0, 'killed': None, 'time': 1.0, 'extra': None},
+        {'index': 1, 'killed': None, 'time': 2.0, 'extra': None},
+        {'index': 2, 'killed': 'wall_time', 'time': 2.5, 'extra': None},
+        {'index': 3, 'killed': None, 'time': None, 'extra': 'x'},
+    ]
+    assert not (tmp_path / 'data.parquet.partial').exists()
+
+
+def test_parquet_mixed_types(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'data.parquet'
+    with ParquetSink(str(path), batch_size=2) as sink:
+        sink.write(0, _params(0), {'value': 1, 'path': tmp_path})
+        sink.write(1, _params(1), {'value': 'a', 'path': None})
+        sink.write(2, _params(2), {'value': 2, 'flag': True})
+        sink.write(3, _params(3), {'value': 3.5, 'flag': 'no'})
+        sink.write(4, _params(4), {'value': None, 'flag': False})
+
+    assert _parquet_records(path) == [
+        {'index': 0, 'value': '1', 'path': str(tmp_path), 'flag': None},
+        {'index': 1, 'value': 'a', 'path': None, 'flag': None},
+        {'index': 2, 'value': '2.0', 'path': None, 'flag': 'True'},
+        {'index': 3, 'value': '3.5', 'path': None, 'flag': 'no'},
+        {'index': 4, 'value': None, 'path': None, 'flag': 'False'},
+    ]
+
+
+def test_parquet_schema(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'data.parquet'
+    schema = pyarrow.schema(
+        [('index', pyarrow.int64()), ('time', pyarrow.float32())])
+    with ParquetSink(str(path), schema=schema) as sink:
+        sink.write(0, _params(0), {'time': 1, 'extra': 'dropped'})
+
+    table = parquet.read_table(str(path))
+    assert table.schema == schema
+    assert table.to_pylist() == [{'index': 0, 'time': 1.0}]
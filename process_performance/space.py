@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Parameter space shape as indexable sequence of points.
+    Point position maps to value indexes arithmetically,
+    parameters dict is built only when point is accessed.
+"""
+
+import array
+import bisect
+import copy
+from typing import Callable
+
+from process_performance.constraints import resolve
+from process_performance.parameter import Parameter, _collapse_generator
+from process_performance.shape import ParameterSpaceShape
+
+
+def _unique(parameter: Parameter) -> list[int]:
+    """
+    Indexes of first occurrences of parameter values,
+    repeated values would produce repeated points.
+    """
+    values = parameter.values
+    return [i for i, value in enumerate(values) if values.index(value) == i]
+
+
+def _corners(parameter: Parameter) -> list[int]:
+    unique = _unique(parameter)
+    return [unique[0], unique[-1]] if len(unique) > 1 else unique
+
+
+def _edge(parameter: Parameter) -> list[int]:
+    return list(_collapse_generator(_unique(parameter)[1:-1]))
+
+
+def _cube(parameter: Parameter) -> list[int]:
+    return list(_collapse_generator(_unique(parameter)))
+
+
+def _blocks(
+        parameters: list[Parameter],
+        shape: ParameterSpaceShape) -> list[list[list[int]]]:
+    """
+    Returns shape as list of blocks, every block is a product
+    of value index axes, one axis per parameter.
+    Blocks are disjoint, so every point is generated once:
+    EDGES block of a parameter takes its inner values only
+    and corner values of all other parameters.
+    """
+    if shape == ParameterSpaceShape.CUBE:
+        return [[_cube(p) for p in parameters]]
+    if shape == ParameterSpaceShape.CORNERS:
+        return [[_corners(p) for p in parameters]]
+    return [
+        [_edge(p) if i == line else _corners(p)
+         for i, p in enumerate(parameters)]
+        for line in range(len(parameters))]
+
+
+def _size(block: list[list[int]]) -> int:
+    size = 1
+    for axis in block:
+        size *= len(axis)
+    return size
+
+
+class ParameterSpace():
+    """
+    Unique points of parameter space shape in order of `Parameters.gen`,
+    with O(1) random access by position, `len()`, slicing and sharding.
+    Slices and shards are views sharing value index axes.
+
+    Points violating `constraints` are pruned, so are points differing
+    only in values of conditional parameters which are not active,
+    also across EDGES blocks: such point is kept in first block
+    generating it.
+    Iteration prunes points as it goes; `len()`, indexing and slicing
+    need positions of valid points, evaluating every point once
+    when first used and keeping them.
+    """
+
+    def __init__(
+            self,
+            parameters: list[Parameter],
+            shape: ParameterSpaceShape = ParameterSpaceShape.CUBE,
+            constraints: list[Callable[[dict], bool]] = ()):
+        self._parameters = list(parameters)
+        self._constraints = list(constraints)
+        self.shape = shape
+        self._blocks = _blocks(self._parameters, shape)
+        self._offsets = [0]
+        for block in self._blocks:
+            self._offsets.append(self._offsets[-1] + _size(block))
+        self._all = range(self._offsets[-1])
+        # positions of valid points, None until pruned
+        self._valid_positions = self._all
+        if self._constraints or any(
+                p.when is not None for p in self._parameters):
+            self._valid_positions = None
+
+    @property
+    def parameters(self) -> list[Parameter]:
+        return list(self._parameters)
+
+    @property
+    def _positions(self):
+        if self._valid_positions is None:
+            self._valid_positions = array.array('q', (
+                position for position in self._all
+                if self._valid_point(position) is not None))
+        return self._valid_positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            view = copy.copy(self)
+            view._valid_positions = self._positions[key]
+            return view
+        return self.point(key)
+
+    def __iter__(self):
+        if self._valid_positions is not None:
+            for position in self._valid_positions:
+                yield self.resolve(self._indexes(position)[1])
+            return
+        for position in self._all:
+            params = self._valid_point(position)
+            if params is not None:
+                yield params
+
+    def shard(self, shard: int, shards: int) -> 'ParameterSpace':
+        """
+        Every `shards`-th point starting from `shard`,
+        shards of one space are disjoint and cover it.
+        """
+        return self[shard::shards]
+
+    def indexes(self, position: int) -> tuple[int]:
+        """
+        Value indexes into `Parameter.values` of point at position,
+        including parameters which are not active.
+        """
+        return self._indexes(self._positions[position])[1]
+
+    def point(self, position: int) -> dict:
+        """
+        Parameters dict of point at position.
+        """
+        return self.resolve(self.indexes(position))
+
+    def resolve(self, indexes: tuple[int]) -> dict:
+        """
+        Parameters dict of point given by value indexes
+        or None if it violates a constraint.
+        """
+        return resolve(self._parameters, self._constraints, indexes)
+
+    def index_array(self):
+        """
+        NumPy array of value indexes of every point,
+        one row per point, one column per parameter.
+        """
+        import numpy  # pylint: disable=import-outside-toplevel
+        if not self._parameters:
+            return numpy.zeros((len(self), 0), dtype=numpy.intp)
+        positions = self._positions
+        if isinstance(positions, range):
+            positions = numpy.arange(
+                positions.start, positions.stop, positions.step)
+        else:
+            positions = numpy.frombuffer(positions, dtype=numpy.int64)
+        blocks = numpy.searchsorted(
+            self._offsets, positions, side='right') - 1
+        indexes = numpy.empty(
+            (len(positions), len(self._parameters)), dtype=numpy.intp)
+        for block, axes in enumerate(self._blocks):
+            rows = blocks == block
+            if not rows.any():
+                continue
+            digits = numpy.unravel_index(
+                positions[rows] - self._offsets[block],
+                [len(axis) for axis in axes])
+            for column, (axis, digit) in enumerate(zip(axes, digits)):
+                indexes[rows, column] = numpy.asarray(axis)[digit]
+        return indexes
+
+    def _indexes(self, position: int) -> tuple[int, tuple[int]]:
+        """
+        Returns block and value indexes of point at position.
+        """
+        block = bisect.bisect_right(self._offsets, position) - 1
+        local = position - self._offsets[block]
+        indexes = []
+        for axis in reversed(self._blocks[block]):
+            local, digit = divmod(local, len(axis))
+            indexes.append(axis[digit])
+        return block, tuple(reversed(indexes))
+
+    def _valid_point(self, position: int) -> dict:
+        """
+        Parameters dict of point at position of the whole shape
+        if it satisfies constraints and every parameter which
+        is not active has first value of its axis, None otherwise.
+        """
+        block, indexes = self._indexes(position)
+        params = self.resolve(indexes)
+        if params is None or not all(
+                parameter.name in params or index == axis[0]
+                for parameter, index, axis in zip(
+                    self._parameters, indexes, self._blocks[block])):
+            return None
+        if len(params) < len(self._parameters) and any(
+                self._contains(earlier, params, indexes)
+                for earlier in range(block)):
+            return None
+        return params
+
+    def _contains(self, block: int, params: dict, indexes: tuple) -> bool:
+        """
+        Checks if block generates point reduced to active parameters,
+        EDGES blocks are disjoint only for points of all parameters.
+        """
+        axes = self._blocks[block]
+        return all(axes) and all(
+            index in axis
+            for parameter, index, axis in zip(
+                self._parameters, indexes, axes)
+            if parameter.name in params)
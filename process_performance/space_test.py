@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for ParameterSpace class
+"""
+
+import pytest
+
+from process_performance.parameters import Parameters
+from process_performance.shape import ParameterSpaceShape
+from process_performance.space import ParameterSpace
+
+_PARAMETERS = Parameters.from_dict({
+    'x': [1, 2, 3, 4],
+    'y': ['i'],
+    'z': [0.1, 0.2, 0.3],
+})
+
+
+@pytest.mark.parametrize('shape', list(ParameterSpaceShape))
+def test_random_access(shape):
+    space = _PARAMETERS.space(shape)
+    points = list(space)
+
+    assert len(space) == len(points)
+    assert [space[i] for i in range(len(space))] == points
+    assert space[-1] == points[-1]
+    assert {tuple(space.indexes(i)) for i in range(len(space))} == {
+        tuple(p.values.index(point[p.name]) for p in _PARAMETERS.parameters)
+        for point in points}
+
+
+def test_cube_size():
+    space = ParameterSpace(_PARAMETERS.parameters)
+
+    assert len(space) == 4 * 1 * 3
+    assert space[0] == {'x': 1, 'y': 'i', 'z': 0.1}
+    assert space.indexes(1) == (0, 0, 2)
+
+
+def test_slice_and_shard():
+    space = _PARAMETERS.space(ParameterSpaceShape.CUBE)
+    points = list(space)
+
+    assert list(space[2:5]) == points[2:5]
+    assert space[2:5][1] == points[3]
+    assert len(space[::5]) == len(points[::5])
+    shards = [space.shard(shard, 3) for shard in range(3)]
+    assert sorted(
+        (point for shard in shards for point in shard),
+        key=points.index) == points
+
+
+@pytest.mark.parametrize('shape', list(ParameterSpaceShape))
+@pytest.mark.parametrize('constraints', [(), (lambda p: p['x'] != 3,)])
+def test_index_array(shape, constraints):
+    numpy = pytest.importorskip('numpy')
+    parameters = Parameters(
+        *_PARAMETERS.parameters, constraints=constraints)
+    space = parameters.space(shape)[1:]
+
+    assert numpy.array_equal(
+        space.index_array(),
+        [space.indexes(i) for i in range(len(space))])
+
+
+@pytest.mark.parametrize('shape', list(ParameterSpaceShape))
+def test_index_array_no_parameters(shape):
+    pytest.importorskip('numpy')
+    space = ParameterSpace([], shape)
+
+    assert space.index_array().shape == (len(space), 0)
+
+
+def test_constraints_lazy():
+    checked = []
+
+    def constraint(params: dict) -> bool:
+        checked.append(params)
+        return params['x'] != 2
+
+    parameters = Parameters.from_dict(
+        {'x': [1, 2, 3], 'y': list(range(100))}, constraints=[constraint])
+    space = parameters.space(ParameterSpaceShape.CUBE)
+
+    assert next(iter(space)) == {'x': 1, 'y': 0}
+    assert len(checked) == 1
+    assert len(space) == 200
+    assert len(space[::2]) == 100
+    assert parameters.count(ParameterSpaceShape.CUBE) == 200
+    assert len(checked) == 1 + 300
+    assert list(space) == list(parameters.gen(ParameterSpaceShape.CUBE)())
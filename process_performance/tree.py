@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Descendants of subprocess: kept in its process group,
+    killed together with it and accounted in its resource usage.
+"""
+
+import ctypes
+import os
+import signal
+import sys
+from dataclasses import dataclass
+
+from process_performance.usage import _rusage_usage, reap
+
+_PR_SET_CHILD_SUBREAPER = 36
+
+# groups of subprocesses running in this process, killed on SIGTERM
+_running = set()
+# set in pool workers of runner, which may change process-wide state
+_in_worker = False  # pylint: disable=invalid-name
+# pid of process which became subreaper, the attribute is not inherited
+_subreaper = None  # pylint: disable=invalid-name
+
+
+def _become_subreaper() -> bool:
+    """
+    Makes orphaned descendants of this process reparent to it
+    instead of init, so they can be waited for. Linux only.
+    """
+    global _subreaper  # pylint: disable=global-statement
+    if _subreaper != os.getpid() and sys.platform.startswith('linux'):
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.prctl(_PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0:
+                _subreaper = os.getpid()
+        except (OSError, AttributeError):
+            pass
+    return _subreaper == os.getpid()
+
+
+def kill(process) -> None:
+    """
+    Kills process and, when it leads its own process group,
+    all of the group. Exited process is not reaped, so its
+    resource usage can still be collected.
+    """
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, 'killpg') and os.getpgid(process.pid) == process.pid:
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            # Popen.kill would poll and reap exited process
+            os.kill(process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+    except OSError:
+        # exited already, windows denies terminating exited process
+        pass
+
+
+def _terminate(signum, _frame):
+    for group in list(_running):
+        group.kill()
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+
+def init_worker() -> None:
+    """
+    Called in pool worker. Process groups of running subprocesses
+    are killed when worker is terminated, they would keep running
+    otherwise. Handler is set only while a subprocess runs, idle worker
+    blocked in pool queue lock could not run it and would not terminate.
+
+    Worker becomes child subreaper unless ProcessTree disables it.
+    """
+    global _in_worker  # pylint: disable=global-statement
+    _in_worker = True
+
+
+@dataclass
+class ProcessTree:
+    """
+    Selects how descendants of subprocess are handled.
+
+    Subprocess starts a new session, so all its descendants share
+    its process group unless they start their own. Whole group
+    is killed when process exceeds limits, when its run is aborted
+    and once process exits, so no leftover descendants keep running
+    into next measurement. `group=False` keeps subprocess in process
+    group of runner, only subprocess itself is killed then.
+
+    With `subreaper`, on linux, process running subprocesses becomes
+    child subreaper: descendants orphaned by exit of their parent
+    are reparented to it and their resource usage is added
+    to InvokeResult once they are killed. Usage of descendants waited
+    for by their parents is included by the platform anyway.
+    Being subreaper is process-wide and lasts for process lifetime,
+    by default only pool workers of runner become one;
+    set True to make any process running subprocesses one.
+    """
+    group: bool = True
+    subreaper: bool = None
+
+    def popen_options(self) -> dict:
+        """
+        Extra subprocess.Popen arguments, call before process starts.
+        """
+        if not self.group or not hasattr(os, 'killpg'):
+            return {}
+        if self.subreaper or (self.subreaper is None and _in_worker):
+            _become_subreaper()
+        return {'start_new_session': True}
+
+    def track(self, process) -> '_Group':
+        return _Group(self, process)
+
+
+class _Group():
+    """
+    Process group of one subprocess.
+    """
+
+    def __init__(self, tree: ProcessTree, process):
+        self.tree = tree
+        self.process = process
+        if _in_worker and not _running:
+            signal.signal(signal.SIGTERM, _terminate)
+        _running.add(self)
+
+    def kill(self) -> None:
+        if self.process.returncode is None or not self.tree.group or \
+                not hasattr(os, 'killpg'):
+            kill(self.process)
+            return
+        # leader was reaped by `usage.exited` where waitid() is missing,
+        # its id stays reserved as group id while descendants are in it
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def reap(self) -> dict:
+        """
+        Kills leftover descendants, reaps exited subprocess
+        and orphans reparented to this process. Returns usage of
+        subprocess and orphans as `usage.reap` does.
+        """
+        self.kill()
+        _running.discard(self)
+        if _in_worker and not _running:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        usage = reap(self.process)
+        if self.tree.group and _subreaper == os.getpid():
+            for orphan in self._reap_orphans():
+                for name in ('time_user', 'time_system'):
+                    if name in usage:
+                        usage[name] += orphan[name]
+                if 'max_rss' in usage:
+                    usage['max_rss'] = max(usage['max_rss'], orphan['max_rss'])
+        return usage
+
+    def _reap_orphans(self):
+        while True:
+            try:
+                _, _, rusage = os.wait4(-self.process.pid, 0)
+            except ChildProcessError:
+                return
+            yield _rusage_usage(rusage)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for ProcessTree class
+"""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from process_performance.limits import Limits
+from process_performance.monitor import Monitor
+from process_performance.tree import ProcessTree
+
+posix_only = pytest.mark.skipif(
+    sys.platform == 'win32', reason='process groups are posix only')
+
+# prints pid of grandchild left running after exit
+_LEFTOVER = '''
+import subprocess, sys
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+print(child.pid, flush=True)
+'''
+
+# grandchild burns cpu while child only waits
+_BUSY = '''
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+print(child.pid, flush=True)
+time.sleep(30)
+'''
+
+# burns cpu itself, no descendants
+_SELF_BUSY = '''
+import time
+while time.process_time() < 0.2: pass
+'''
+
+# grandchild burning cpu is not waited for
+_ORPHAN = '''
+import subprocess, sys, time
+subprocess.Popen([sys.executable, "-c",
+                  "import time\\nwhile time.process_time() < 0.5: pass"])
+time.sleep(1)
+'''
+
+
+def _run(code: str, tree: ProcessTree, limits: Limits = None):
+    with subprocess.Popen(
+            [sys.executable, '-c', code], stdout=subprocess.PIPE,
+            **tree.popen_options()) as process:
+        group = tree.track(process)
+        killed = Monitor().watch(process, lambda pid: None, limits)
+        usage = group.reap()
+        return killed, usage, process.stdout.readline()
+
+
+def _gone(pid: int, timeout: float = 5) -> bool:
+    # killed orphan not reaped by this process exits asynchronously
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if psutil.Process(pid).status() == psutil.STATUS_ZOMBIE:
+                return True
+        except psutil.NoSuchProcess:
+            return True
+        if time.perf_counter() > deadline:
+            return False
+        time.sleep(0.01)
+
+
+@posix_only
+def test_leftover_killed():
+    _, _, output = _run(_LEFTOVER, ProcessTree())
+
+    assert _gone(int(output))
+
+
+@posix_only
+def test_leftover_killed_without_waitid(monkeypatch):
+    # leader is reaped once it exits, like on macos before python 3.13
+    monkeypatch.delattr(os, 'waitid', raising=False)
+    monkeypatch.delattr(os, 'pidfd_open', raising=False)
+    _, usage, output = _run(_LEFTOVER, ProcessTree())
+
+    assert _gone(int(output))
+    assert 'time_user' in usage
+
+
+@posix_only
+def test_leftover_kept_without_group():
+    _, _, output = _run(_LEFTOVER, ProcessTree(group=False))
+
+    leftover = psutil.Process(int(output))
+    assert leftover.is_running()
+    leftover.kill()
+
+
+def _orphan_usage() -> dict:
+    return _run(_ORPHAN, ProcessTree(subreaper=True))[1]
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason='child subreaper is linux only')
+def test_orphan_usage():
+    # being subreaper lasts for process lifetime, keep it out of pytest
+    with multiprocessing.Pool(1) as pool:
+        usage = pool.apply(_orphan_usage)
+
+    assert usage['time_user'] + usage['time_system'] >= 0.5
+
+
+@posix_only
+def test_cpu_time_limit_counts_tree():
+    started = time.perf_counter()
+    killed, _, output = _run(_BUSY, ProcessTree(), Limits(cpu_time=0.3))
+
+    assert killed == 'cpu_time'
+    assert _gone(int(output))
+    assert time.perf_counter() - started < 10
+
+
+@pytest.mark.parametrize('group', [True, False])
+def test_usage(group):
+    _, usage, _ = _run(_SELF_BUSY, ProcessTree(group=group))
+
+    assert usage['time_user'] + usage['time_system'] >= 0.2
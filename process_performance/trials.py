@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Repeated runs of one parameter point
+    and statistical aggregation of their data.
+"""
+
+import math
+import statistics
+from dataclasses import dataclass, field
+
+
+def _t_quantile(probability: float, freedom: int) -> float:
+    """
+    Student's t distribution quantile.
+    Exact for 1 and 2 degrees of freedom,
+    Cornish-Fisher approximation otherwise.
+    """
+    if freedom == 1:
+        return math.tan(math.pi * (probability - 0.5))
+    if freedom == 2:
+        return (2 * probability - 1) / math.sqrt(
+            2 * probability * (1 - probability))
+    z = statistics.NormalDist().inv_cdf(probability)
+    return (
+        z
+        + (z ** 3 + z) / (4 * freedom)
+        + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * freedom ** 2)
+        + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z)
+        / (384 * freedom ** 3))
+
+
+def _reject_outliers(values: list[float]) -> list[float]:
+    """
+    Drops values outside of Tukey's fences.
+    """
+    if len(values) < 4:
+        return values
+    low, _, high = statistics.quantiles(values, n=4)
+    fence = 1.5 * (high - low)
+    return [v for v in values if low - fence <= v <= high + fence]
+
+
+def summarize(
+        values: list[float],
+        confidence: float = 0.95,
+        reject_outliers: bool = True) -> dict:
+    """
+    Returns median, mean, stdev, confidence interval of the mean
+    and number of rejected outliers.
+    """
+    kept = _reject_outliers(values) if reject_outliers else list(values)
+    mean = statistics.fmean(kept)
+    if len(kept) < 2:
+        stdev = 0.0
+        half_width = math.inf
+    else:
+        stdev = statistics.stdev(kept)
+        half_width = _t_quantile(
+            (1 + confidence) / 2, len(kept) - 1) * stdev / math.sqrt(
+                len(kept))
+    return {
+        'median': statistics.median(kept),
+        'mean': mean,
+        'stdev': stdev,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'outliers': len(values) - len(kept),
+    }
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Trials:
+    """
+    Runs every point `warmup` + `repeat` times, discarding warmup runs.
+    Data of the point is data of first measured run where every
+    key from `metrics` is replaced by median of measured runs,
+    with `<metric>_mean`, `_median`, `_stdev`, `_ci_low`, `_ci_high`
+    and `_outliers` keys added, `trials` holds number of measured runs.
+
+    When `precision` is set, point is run again, up to `max_repeat`
+    measured runs, until confidence interval half width of every metric
+    is within `precision` fraction of its mean.
+    """
+    repeat: int = 5
+    warmup: int = 0
+    metrics: list[str] = field(default_factory=list)
+    confidence: float = 0.95
+    precision: float = None
+    max_repeat: int = 30
+    reject_outliers: bool = True
+
+    def __post_init__(self):
+        if self.repeat < 1:
+            raise ValueError(
+                f'Trials repeat must be at least 1, got {self.repeat}')
+
+    def _summaries(self, samples: list[dict]) -> dict:
+        return {
+            metric: summarize(
+                [float(sample[metric]) for sample in samples],
+                confidence=self.confidence,
+                reject_outliers=self.reject_outliers)
+            for metric in self.metrics
+        }
+
+    def needs_more(self, runs: int, samples: list[dict]) -> bool:
+        """
+        Checks if point should be run again
+        after `runs` runs with `samples` measured data.
+        """
+        if runs < self.warmup + self.repeat:
+            return True
+        if self.precision is None or len(samples) >= self.max_repeat:
+            return False
+        for summary in self._summaries(samples).values():
+            half_width = (summary['ci_high'] - summary['ci_low']) / 2
+            if half_width > self.precision * abs(summary['mean']):
+                return True
+        return False
+
+    def aggregate(self, samples: list[dict]) -> dict:
+        data = dict(samples[0])
+        data['trials'] = len(samples)
+        for metric, summary in self._summaries(samples).items():
+            data[metric] = summary['median']
+            for name, value in summary.items():
+                data[f'{metric}_{name}'] = value
+        return data
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Trials class
+"""
+
+import math
+
+import pytest
+
+from process_performance.trials import Trials, _t_quantile, summarize
+
+
+@pytest.mark.parametrize("freedom,quantile", [
+    (1, 12.706),
+    (2, 4.303),
+    (5, 2.571),
+    (30, 2.042),
+])
+def test_t_quantile(freedom, quantile):
+    assert _t_quantile(0.975, freedom) == pytest.approx(quantile, rel=0.01)
+
+
+def test_summarize():
+    summary = summarize([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert summary['median'] == 3.0
+    assert summary['mean'] == 3.0
+    assert summary['stdev'] == pytest.approx(1.5811, rel=1e-3)
+    assert summary['ci_low'] < 3.0 < summary['ci_high']
+    assert summary['outliers'] == 0
+
+
+def test_summarize_outliers():
+    values = [1.0, 1.1, 0.9, 1.0, 1.05, 10.0]
+    assert summarize(values)['outliers'] == 1
+    assert summarize(values)['mean'] == pytest.approx(1.01)
+    assert summarize(values, reject_outliers=False)['outliers'] == 0
+
+
+def test_summarize_single():
+    summary = summarize([2.0])
+    assert summary['mean'] == 2.0
+    assert math.isinf(summary['ci_high'])
+
+
+def test_needs_more_fixed():
+    trials = Trials(repeat=2, warmup=1, metrics=['time'])
+    assert trials.needs_more(1, [])
+    assert trials.needs_more(2, [{'time': 1}])
+    assert not trials.needs_more(3, [{'time': 1}, {'time': 5}])
+
+
+@pytest.mark.parametrize('repeat', [0, -1])
+def test_repeat_positive(repeat):
+    with pytest.raises(ValueError):
+        Trials(repeat=repeat)
+
+
+def test_needs_more_adaptive():
+    trials = Trials(repeat=2, metrics=['time'], precision=0.05, max_repeat=4)
+    noisy = [{'time': 1}, {'time': 5}]
+    assert trials.needs_more(2, noisy)
+    assert not trials.needs_more(4, noisy * 2)
+    assert not trials.needs_more(3, [{'time': 1}] * 3)
+
+
+def test_aggregate():
+    trials = Trials(repeat=3, metrics=['time'])
+    data = trials.aggregate([
+        {'time': '3.0', 'args': '-1'},
+        {'time': '1.0', 'args': '-1'},
+        {'time': '2.0', 'args': '-1'},
+    ])
+    assert data['args'] == '-1'
+    assert data['trials'] == 3
+    assert data['time'] == 2.0
+    assert data['time_mean'] == 2.0
+    assert data['time_stdev'] == 1.0
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Resource usage accounting of exited subprocess.
+    Uses wait4() rusage where available, psutil otherwise.
+"""
+
+import os
+import sys
+import weakref
+
+import psutil
+
+# process -> usage of process reaped by `exited`
+_reaped = weakref.WeakKeyDictionary()
+
+
+def _psutil_usage(pid: int) -> dict:
+    """
+    Best effort usage of exited, but not yet reaped process.
+    """
+    usage = {}
+    try:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            times = process.cpu_times()
+            usage['time_user'] = times.user
+            usage['time_system'] = times.system
+            switches = process.num_ctx_switches()
+            usage['ctx_switches_voluntary'] = switches.voluntary
+            usage['ctx_switches_involuntary'] = switches.involuntary
+            memory = process.memory_info()
+            if hasattr(memory, 'peak_wset'):
+                usage['max_rss'] = memory.peak_wset
+            if hasattr(process, 'io_counters'):
+                io_counters = process.io_counters()
+                usage['read_bytes'] = io_counters.read_bytes
+                usage['write_bytes'] = io_counters.write_bytes
+    except (psutil.Error, OSError):
+        pass
+    return usage
+
+
+def _rusage_usage(rusage) -> dict:
+    # ru_maxrss is in kilobytes everywhere except darwin
+    rss_unit = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'time_user': rusage.ru_utime,
+        'time_system': rusage.ru_stime,
+        'max_rss': rusage.ru_maxrss * rss_unit,
+        'ctx_switches_voluntary': rusage.ru_nvcsw,
+        'ctx_switches_involuntary': rusage.ru_nivcsw,
+    }
+
+
+def exited(process) -> bool:
+    """
+    Checks if subprocess.Popen process exited without reaping it
+    where waitid() is available. Elsewhere on posix, like macos before
+    python 3.13, exited process is reaped with wait4(), its resource
+    usage is kept for `reap`; process.poll() would lose it.
+    """
+    if process.returncode is not None:
+        return True
+    if hasattr(os, 'waitid'):
+        try:
+            return os.waitid(
+                os.P_PID, process.pid,
+                os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None
+        except ChildProcessError:
+            return True
+    if hasattr(os, 'wait4'):
+        return _reap_exited(process)
+    return process.poll() is not None
+
+
+def _reap_exited(process) -> bool:
+    try:
+        pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+    except ChildProcessError:
+        return True
+    if pid == 0:
+        return False
+    process.returncode = os.waitstatus_to_exitcode(status)
+    _reaped[process] = _rusage_usage(rusage)
+    return True
+
+
+def reap(process) -> dict:
+    """
+    Reaps exited subprocess.Popen process, setting its returncode.
+    Returns dictionary of InvokeResult resource usage fields
+    which could be collected on this platform.
+    """
+    usage = _psutil_usage(process.pid)
+    if process in _reaped:
+        usage.update(_reaped.pop(process))
+    elif process.returncode is None and hasattr(os, 'wait4'):
+        try:
+            _, status, rusage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            pass
+        else:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            usage.update(_rusage_usage(rusage))
+    process.wait()
+    return usage
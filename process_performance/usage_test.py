@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for resource usage accounting
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from process_performance.monitor import Monitor, MonitorStrategy
+from process_performance.usage import reap
+
+_CPU_LOADER = (
+    'import time\n'
+    'started = time.process_time()\n'
+    'buffer = bytearray(64 * 1024 * 1024)\n'
+    'while time.process_time() - started < 0.3: pass\n'
+)
+
+
+def test_reap_usage():
+    with subprocess.Popen([sys.executable, '-c', _CPU_LOADER]) as process:
+        Monitor().watch(process, lambda pid: None)
+        usage = reap(process)
+
+    assert process.returncode == 0
+    assert usage['time_user'] + usage['time_system'] >= 0.3
+    if sys.platform != 'darwin':
+        assert usage['max_rss'] >= 64 * 1024 * 1024
+    assert usage['ctx_switches_voluntary'] >= 0
+
+
+def test_reap_exit_code():
+    with subprocess.Popen([sys.executable, '-c', 'exit(3)']) as process:
+        Monitor().watch(process, lambda pid: None)
+        reap(process)
+
+    assert process.returncode == 3
+
+
+@pytest.mark.skipif(not hasattr(os, 'wait4'), reason='wait4 is posix only')
+@pytest.mark.parametrize('strategy', list(MonitorStrategy))
+def test_reap_usage_without_waitid(monkeypatch, strategy):
+    # like macos before python 3.13
+    monkeypatch.delattr(os, 'waitid', raising=False)
+    monkeypatch.delattr(os, 'pidfd_open', raising=False)
+    with subprocess.Popen([sys.executable, '-c', _CPU_LOADER]) as process:
+        Monitor(strategy=strategy).watch(process, lambda pid: None)
+        usage = reap(process)
+
+    assert process.returncode == 0
+    assert usage['time_user'] + usage['time_system'] >= 0.3
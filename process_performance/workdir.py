@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Working directories of spawned processes.
+    Either temporary per process or persistent per pool worker.
+"""
+
+import contextlib
+import dataclasses
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from enum import Enum
+
+
+class WorkdirMode(Enum):
+    TEMPORARY = 0
+    REUSE = 1
+
+
+class _WorkerDir():  # pylint: disable=too-few-public-methods
+    """
+    Persistent working directory of one worker process.
+    Reset renames it away and removes old content in background.
+    """
+
+    def __init__(self, root: str, background: bool):
+        self.base = os.path.join(root, f'worker-{os.getpid()}')
+        self.path = os.path.join(self.base, 'work')
+        self.background = background
+        self._resets = 0
+        self._trash = queue.SimpleQueue()
+        shutil.rmtree(self.base, ignore_errors=True)
+        os.makedirs(self.path)
+        if background:
+            threading.Thread(target=self._cleaner, daemon=True).start()
+
+    def _cleaner(self):
+        while True:
+            shutil.rmtree(self._trash.get(), ignore_errors=True)
+
+    def reset(self):
+        self._resets += 1
+        trash = os.path.join(self.base, f'trash-{self._resets}')
+        os.rename(self.path, trash)
+        os.mkdir(self.path)
+        if self.background:
+            self._trash.put(trash)
+        else:
+            shutil.rmtree(trash, ignore_errors=True)
+
+
+# (root, pid) -> working directory of this process,
+# pid guards against entries inherited by forked workers
+_WORKER_DIRS = {}
+
+
+@dataclass
+class Workdir:
+    """
+    Selects working directory of spawned processes.
+
+    TEMPORARY creates new directory for every process and removes it
+    recursively afterwards. REUSE gives every pool worker persistent
+    directory, which is reset after every process by renaming it away
+    and creating new empty one, old content is removed by background
+    thread if `background` is set. `pre` always receives empty directory.
+
+    `root` is where directories are created, system temporary directory
+    by default, point it to tmpfs (like /dev/shm) to avoid disk io.
+    """
+    mode: WorkdirMode = WorkdirMode.TEMPORARY
+    root: str = None
+    background: bool = True
+
+    @contextlib.contextmanager
+    def use(self):
+        """
+        Yields empty directory for one process.
+        """
+        if self.mode == WorkdirMode.TEMPORARY:
+            with tempfile.TemporaryDirectory(dir=self.root) as tmpdir:
+                yield tmpdir
+            return
+        key = (self.root or tempfile.gettempdir(), os.getpid())
+        if key not in _WORKER_DIRS:
+            _WORKER_DIRS[key] = _WorkerDir(key[0], self.background)
+        worker_dir = _WORKER_DIRS[key]
+        try:
+            yield worker_dir.path
+        finally:
+            worker_dir.reset()
+
+    @contextlib.contextmanager
+    def prepared(self):
+        """
+        Yields Workdir using directory private to one run,
+        which is removed with everything left in it afterwards.
+        """
+        if self.mode == WorkdirMode.TEMPORARY:
+            yield self
+            return
+        root = tempfile.mkdtemp(prefix='workdirs-', dir=self.root)
+        try:
+            yield dataclasses.replace(self, root=root)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
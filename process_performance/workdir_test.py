@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+    Tests for Workdir class
+"""
+
+import os
+import time
+
+import pytest
+
+from process_performance.workdir import Workdir, WorkdirMode
+
+
+def _leave_file(workdir):
+    os.makedirs(os.path.join(workdir, 'build'))
+    with open(os.path.join(workdir, 'build', 'artefact'), 'wb') as artefact:
+        artefact.write(b'data')
+
+
+def test_temporary(tmp_path):
+    workdir = Workdir(root=str(tmp_path))
+    with workdir.use() as first:
+        assert not os.listdir(first)
+        _leave_file(first)
+    with workdir.use() as second:
+        assert not os.listdir(second)
+    assert not os.path.exists(first)
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_reuse(tmp_path, background):
+    with Workdir(mode=WorkdirMode.REUSE, root=str(tmp_path),
+                 background=background).prepared() as workdir:
+        with workdir.use() as first:
+            assert not os.listdir(first)
+            _leave_file(first)
+        with workdir.use() as second:
+            assert second == first
+            assert not os.listdir(second)
+
+        base = os.path.dirname(first)
+        for _ in range(100):
+            if os.listdir(base) == ['work']:
+                break
+            time.sleep(0.01)
+        assert os.listdir(base) == ['work']
+    assert not os.listdir(tmp_path)